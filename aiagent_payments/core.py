@@ -7,8 +7,8 @@ Contains main classes for managing payments, subscriptions, and usage tracking.
 import logging
 import os
 import uuid
-from collections.abc import Callable
-from datetime import datetime, timedelta, timezone
+from collections.abc import Callable, Mapping
+from datetime import datetime, timedelta
 from functools import wraps
 from typing import Any
 
@@ -29,11 +29,25 @@ from .models import (
     PaymentTransaction,
     Subscription,
     UsageRecord,
+    _utc_now,
 )
 from .providers import PaymentProvider, create_payment_provider
 
 logger = logging.getLogger(__name__)
 
+# Length of one billing period, used to compute subscription period ends
+_BILLING_PERIOD_LENGTHS = {
+    BillingPeriod.DAILY: timedelta(days=1),
+    BillingPeriod.WEEKLY: timedelta(weeks=1),
+    BillingPeriod.MONTHLY: timedelta(days=30),
+    BillingPeriod.YEARLY: timedelta(days=365),
+}
+
+
+def _new_id() -> str:
+    """Default id factory for usage records and subscriptions."""
+    return str(uuid.uuid4())
+
 
 def _create_environment_aware_storage() -> StorageBackend:
     """Create a storage backend based on environment and configuration."""
@@ -75,36 +89,84 @@ def _create_environment_aware_storage() -> StorageBackend:
 class UsageTracker:
     """Tracks usage for individual users and features."""
 
-    def __init__(self, storage: StorageBackend):
+    def __init__(
+        self,
+        storage: StorageBackend,
+        *,
+        clock: Callable[[], datetime] = _utc_now,
+        id_factory: Callable[[], str] = _new_id,
+    ):
         """Initialize the usage tracker."""
         self.storage = storage
+        self._clock = clock
+        self._id_factory = id_factory
         logger.debug("UsageTracker initialized with storage backend: %s", type(storage).__name__)
 
-    def record_usage(
+    @staticmethod
+    def _validate_inputs(feature: str, metadata: Mapping[str, Any] | None = None) -> None:
+        """
+        Validate the caller-supplied parts of a usage event.
+
+        The metadata type is enforced statically by the Mapping annotation; the
+        runtime check only runs in debug mode and is stripped under ``python -O``.
+        """
+        if not feature or not isinstance(feature, str):
+            raise ValidationError("Feature name is required and must be a string", field="feature", value=feature)
+        if __debug__:
+            if metadata is not None and not isinstance(metadata, Mapping):
+                raise ValidationError("Metadata must be a mapping if provided", field="metadata", value=metadata)
+
+    def _make_record(
         self,
         user_id: str,
         feature: str,
-        cost: float | None = None,
-        metadata: dict[str, Any] | None = None,
+        cost: float | None,
+        metadata: Mapping[str, Any] | None,
+        timestamp: datetime,
     ) -> UsageRecord:
-        """Record a usage event for a user and feature."""
-        if not feature or not isinstance(feature, str):
-            raise ValidationError("Feature name is required and must be a string", field="feature", value=feature)
-        if metadata is not None and not isinstance(metadata, dict):
-            raise ValidationError("Metadata must be a dictionary if provided", field="metadata", value=metadata)
-
-        record = UsageRecord(
-            id=str(uuid.uuid4()),
+        """Build a UsageRecord from inputs already checked by _validate_inputs."""
+        if metadata is None:
+            metadata = {}
+        elif not isinstance(metadata, dict) and isinstance(metadata, Mapping):
+            metadata = dict(metadata)
+        # Anything else (only reachable under python -O) is left for UsageRecord.validate() to reject
+        return UsageRecord(
+            id=self._id_factory(),
             user_id=user_id,
             feature=feature,
+            timestamp=timestamp,
             cost=cost,
-            metadata=metadata or {},
+            metadata=metadata,
         )
 
+    def record_usage(
+        self,
+        user_id: str,
+        feature: str,
+        cost: float | None = None,
+        metadata: Mapping[str, Any] | None = None,
+    ) -> UsageRecord:
+        """Record a usage event for a user and feature."""
+        self._validate_inputs(feature, metadata)
+        record = self._make_record(user_id, feature, cost, metadata, self._clock())
+
         self.storage.save_usage_record(record)
-        logger.info(f"Recorded usage for user {user_id}, feature {feature}, cost: {cost or 0.0}")
+        logger.info("Recorded usage for user %s, feature %s, cost: %s", user_id, feature, cost or 0.0)
         return record
 
+    def record_usage_batch(self, user_id: str, items: list[tuple[str, float | None]]) -> list[UsageRecord]:
+        """Record several (feature, cost) usage events for a user, handing the whole batch to ``storage.save_usage_records()``."""
+        # Validate the whole batch up front so record construction below runs unchecked
+        for feature, _ in items:
+            self._validate_inputs(feature)
+
+        now = self._clock()
+        records = [self._make_record(user_id, feature, cost, None, now) for feature, cost in items]
+
+        self.storage.save_usage_records(records)
+        logger.info("Recorded %d usage events for user %s", len(records), user_id)
+        return records
+
     def get_user_usage(
         self,
         user_id: str,
@@ -124,8 +186,7 @@ class UsageTracker:
         end_date: datetime | None = None,
     ) -> int:
         """Get the count of usage for a specific feature."""
-        records = self.get_user_usage(user_id, start_date, end_date)
-        count = len([r for r in records if r.feature == feature])
+        count = self.storage.get_usage_count(user_id, feature, start_date, end_date)
         logger.debug("Usage count for user %s, feature %s: %d", user_id, feature, count)
         return count
 
@@ -136,8 +197,7 @@ class UsageTracker:
         end_date: datetime | None = None,
     ) -> float:
         """Get total cost for a user within a date range."""
-        records = self.get_user_usage(user_id, start_date, end_date)
-        total_cost = sum(r.cost or 0 for r in records)
+        total_cost = self.storage.get_total_cost(user_id, start_date, end_date)
         logger.debug("Total cost for user %s: %.2f", user_id, total_cost)
         return total_cost
 
@@ -145,9 +205,17 @@ class UsageTracker:
 class SubscriptionManager:
     """Manages user subscriptions and billing periods."""
 
-    def __init__(self, storage: StorageBackend):
+    def __init__(
+        self,
+        storage: StorageBackend,
+        *,
+        clock: Callable[[], datetime] = _utc_now,
+        id_factory: Callable[[], str] = _new_id,
+    ):
         """Initialize the subscription manager."""
         self.storage = storage
+        self._clock = clock
+        self._id_factory = id_factory
         logger.debug("SubscriptionManager initialized with storage backend: %s", type(storage).__name__)
 
     def create_subscription(self, user_id: str, plan_id: str, metadata: dict[str, Any] | None = None) -> Subscription:
@@ -165,24 +233,18 @@ class SubscriptionManager:
             logger.info("Cancelled existing subscription for user %s", user_id)
 
         # Calculate billing period dates
-        now = datetime.now(timezone.utc)
+        now = self._clock()
         current_period_start = now
         current_period_end = None
 
         if plan.billing_period:
-            period_mapping = {
-                BillingPeriod.DAILY: timedelta(days=1),
-                BillingPeriod.WEEKLY: timedelta(weeks=1),
-                BillingPeriod.MONTHLY: timedelta(days=30),
-                BillingPeriod.YEARLY: timedelta(days=365),
-            }
             billing_period = (
                 plan.billing_period if isinstance(plan.billing_period, BillingPeriod) else BillingPeriod(plan.billing_period)
             )
-            current_period_end = now + period_mapping.get(billing_period, timedelta(days=30))
+            current_period_end = now + _BILLING_PERIOD_LENGTHS.get(billing_period, timedelta(days=30))
 
         subscription = Subscription(
-            id=str(uuid.uuid4()),
+            id=self._id_factory(),
             user_id=user_id,
             plan_id=plan_id,
             start_date=now,
@@ -228,21 +290,15 @@ class SubscriptionManager:
             return None
 
         # Calculate new billing period
-        now = datetime.now(timezone.utc)
+        now = self._clock()
         current_period_start = now
         current_period_end = None
 
         if plan.billing_period:
-            period_mapping = {
-                BillingPeriod.DAILY: timedelta(days=1),
-                BillingPeriod.WEEKLY: timedelta(weeks=1),
-                BillingPeriod.MONTHLY: timedelta(days=30),
-                BillingPeriod.YEARLY: timedelta(days=365),
-            }
             billing_period = (
                 plan.billing_period if isinstance(plan.billing_period, BillingPeriod) else BillingPeriod(plan.billing_period)
             )
-            current_period_end = now + period_mapping.get(billing_period, timedelta(days=30))
+            current_period_end = now + _BILLING_PERIOD_LENGTHS.get(billing_period, timedelta(days=30))
 
         subscription.current_period_start = current_period_start
         subscription.current_period_end = current_period_end
@@ -266,13 +322,13 @@ class SubscriptionManager:
             return False
 
         # Check if feature is included in the plan
-        if feature not in plan.features:
+        if not plan.has_feature(feature):
             logger.debug("Feature %s not included in plan %s", feature, plan.id)
             return False
 
         # Check subscription expiration
         if subscription.current_period_end:
-            now = datetime.now(timezone.utc)
+            now = self._clock()
             period_end = subscription.current_period_end
             if isinstance(period_end, str):
                 try:
@@ -406,7 +462,7 @@ class PaymentManager:
         # Check freemium plans for access and usage limits
         plans = self.list_payment_plans()
         for plan in plans:
-            if plan.is_freemium() and feature in plan.features:
+            if plan.is_freemium() and plan.has_feature(feature):
                 usage_count = self.usage_tracker.get_usage_count(user_id, feature)
                 if usage_count < plan.free_requests:
                     logger.debug(
@@ -430,7 +486,7 @@ class PaymentManager:
         # Check if there's a default plan for pay-per-use
         if self.default_plan:
             plan = self.get_payment_plan(self.default_plan)
-            if plan and plan.is_pay_per_use() and feature in plan.features:
+            if plan and plan.is_pay_per_use() and plan.has_feature(feature):
                 logger.debug("User %s can access feature %s via default pay-per-use plan", user_id, feature)
                 return True
 
@@ -479,7 +535,7 @@ class PaymentManager:
 
             # Check freemium plans first
             for plan in plans:
-                if plan.is_freemium() and feature in plan.features:
+                if plan.is_freemium() and plan.has_feature(feature):
                     # Get current usage count atomically within transaction
                     usage_count = self.usage_tracker.get_usage_count(user_id, feature)
                     if usage_count >= plan.free_requests:
@@ -497,7 +553,7 @@ class PaymentManager:
             subscription = self.get_user_subscription(user_id)
             if subscription:
                 sub_plan = self.get_payment_plan(subscription.plan_id)
-                if sub_plan and sub_plan.requests_per_period is not None and feature in sub_plan.features:
+                if sub_plan and sub_plan.requests_per_period is not None and sub_plan.has_feature(feature):
                     if subscription.usage_count >= sub_plan.requests_per_period:
                         rollback = getattr(self.storage, "rollback", None)
                         if callable(rollback):
@@ -511,7 +567,7 @@ class PaymentManager:
 
             # If we get here, usage is allowed - record it atomically
             record = self.usage_tracker.record_usage(user_id, feature, cost)
-            logger.info(f"Recorded usage for user {user_id}, feature {feature}, cost: {cost or 0.0}")
+            logger.info("Recorded usage for user %s, feature %s, cost: %s", user_id, feature, cost or 0.0)
 
             # Update subscription usage count atomically
             if subscription:
@@ -548,7 +604,7 @@ class PaymentManager:
 
             # Check freemium plans first
             for plan in plans:
-                if plan.is_freemium() and feature in plan.features:
+                if plan.is_freemium() and plan.has_feature(feature):
                     # Get current usage count atomically
                     usage_count = self.usage_tracker.get_usage_count(user_id, feature)
                     if usage_count >= plan.free_requests:
@@ -563,7 +619,7 @@ class PaymentManager:
             subscription = self.get_user_subscription(user_id)
             if subscription:
                 sub_plan = self.get_payment_plan(subscription.plan_id)
-                if sub_plan and sub_plan.requests_per_period is not None and feature in sub_plan.features:
+                if sub_plan and sub_plan.requests_per_period is not None and sub_plan.has_feature(feature):
                     if subscription.usage_count >= sub_plan.requests_per_period:
                         raise UsageLimitExceeded(
                             f"Usage limit exceeded for feature: {feature}",
@@ -574,7 +630,7 @@ class PaymentManager:
 
             # If we get here, usage is allowed - record it atomically
             record = self.usage_tracker.record_usage(user_id, feature, cost)
-            logger.info(f"Recorded usage for user {user_id}, feature {feature}, cost: {cost or 0.0}")
+            logger.info("Recorded usage for user %s, feature %s, cost: %s", user_id, feature, cost or 0.0)
 
             # Update subscription usage count atomically
             if subscription:
@@ -600,7 +656,7 @@ class PaymentManager:
                     # Check for usage limit exceeded in freemium plans
                     plans = self.list_payment_plans()
                     for plan in plans:
-                        if plan.is_freemium() and feature in plan.features:
+                        if plan.is_freemium() and plan.has_feature(feature):
                             usage_count = self.usage_tracker.get_usage_count(user_id, feature)
                             if usage_count >= plan.free_requests:
                                 raise UsageLimitExceeded(
@@ -613,7 +669,7 @@ class PaymentManager:
                     subscription = self.get_user_subscription(user_id)
                     if subscription:
                         sub_plan = self.get_payment_plan(subscription.plan_id)
-                        if sub_plan and sub_plan.requests_per_period is not None and feature in sub_plan.features:
+                        if sub_plan and sub_plan.requests_per_period is not None and sub_plan.has_feature(feature):
                             if subscription.usage_count >= sub_plan.requests_per_period:
                                 raise UsageLimitExceeded(
                                     f"Usage limit exceeded for feature: {feature}",
@@ -10,6 +10,7 @@ import re
 from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
+from functools import partial
 from typing import Any, Optional
 
 from .config import MINIMUM_AMOUNTS, SUPPORTED_CURRENCIES
@@ -18,6 +19,9 @@ from .utils import sanitize_log_message
 
 logger = logging.getLogger(__name__)
 
+# Default timestamp factory; a partial skips the extra Python frame a lambda costs per instance
+_utc_now = partial(datetime.now, timezone.utc)
+
 
 def _validate_json_serializable(obj: Any, field_name: str, path: str = "") -> None:
     """Validate that an object is JSON serializable, including nested elements."""
@@ -99,7 +103,7 @@ class BillingPeriod(Enum):
     YEARLY = "yearly"
 
 
-@dataclass
+@dataclass(slots=True)
 class PaymentPlan:
     """Represents a payment plan that users can subscribe to."""
 
@@ -115,7 +119,10 @@ class PaymentPlan:
     free_requests: int = 0
     features: list[str] = field(default_factory=list)
     is_active: bool = True
-    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = field(default_factory=_utc_now)
+    # Hashed view of features for access checks, rebuilt by has_feature() whenever the features snapshot changes
+    _feature_key: tuple[str, ...] = field(default=(), init=False, repr=False, compare=False)
+    _feature_set: frozenset[str] = field(default=frozenset(), init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
         """Convert string enums and validate the plan."""
@@ -145,6 +152,7 @@ class PaymentPlan:
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary with proper serialization."""
         data = asdict(self)
+        del data["_feature_key"], data["_feature_set"]
         data["payment_type"] = self.payment_type.value if isinstance(self.payment_type, PaymentType) else str(self.payment_type)
         if self.billing_period:
             data["billing_period"] = (
@@ -153,6 +161,14 @@ class PaymentPlan:
         data["created_at"] = self.created_at.isoformat()
         return data
 
+    def has_feature(self, feature: str) -> bool:
+        """Check if the plan includes a feature."""
+        features = tuple(self.features or ())
+        if features != self._feature_key:
+            self._feature_key = features
+            self._feature_set = frozenset(features)
+        return feature in self._feature_set
+
     def is_freemium(self) -> bool:
         """Check if this is a freemium plan."""
         return self.payment_type == PaymentType.FREEMIUM
@@ -223,7 +239,7 @@ class PaymentPlan:
             _validate_string_field(self.description, "Description", max_length=1000)
 
 
-@dataclass
+@dataclass(slots=True)
 class Subscription:
     """Represents a user's subscription to a payment plan."""
 
@@ -231,7 +247,7 @@ class Subscription:
     user_id: str
     plan_id: str
     status: str = "active"
-    start_date: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    start_date: datetime = field(default_factory=_utc_now)
     end_date: Optional[datetime] = None
     current_period_start: Optional[datetime] = None
     current_period_end: Optional[datetime] = None
@@ -403,14 +419,14 @@ class Subscription:
         _validate_json_serializable(self.metadata, "metadata")
 
 
-@dataclass
+@dataclass(slots=True)
 class UsageRecord:
     """Represents a single usage event for a user and feature."""
 
     id: str
     user_id: str
     feature: str
-    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    timestamp: datetime = field(default_factory=_utc_now)
     cost: Optional[float] = None
     currency: str = "USD"
     metadata: dict[str, Any] = field(default_factory=dict)
@@ -485,7 +501,7 @@ class PaymentTransaction:
     currency: str = "USD"
     payment_method: str = "unknown"
     status: str = "pending"
-    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = field(default_factory=_utc_now)
     completed_at: Optional[datetime] = None
     metadata: dict[str, Any] = field(default_factory=dict)
 
@@ -1235,6 +1235,46 @@ class CryptoProvider(PaymentProvider):
                 raise
             raise PaymentFailed(f"Payment processing failed: {e}", provider_error="crypto")
 
+    def _debug_insert(
+        self,
+        user_id: str,
+        amount: float,
+        currency: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> PaymentTransaction:
+        """
+        Store a pending USDT transaction directly, for seeding test data in dev mode.
+
+        Skips input validation, address normalization, price conversion and network
+        lookups, so the record only carries the metadata needed to list and inspect it.
+
+        Raises:
+            ProviderError: If called outside dev mode
+        """
+        if not self._is_dev_mode():
+            raise ProviderError("_debug_insert is only available in dev mode", provider="crypto")
+
+        transaction = PaymentTransaction(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            amount=amount,
+            currency=currency,
+            payment_method="crypto_usdt",
+            status="pending",
+            created_at=datetime.now(timezone.utc),
+            completed_at=None,
+            metadata={
+                **(metadata or {}),
+                "crypto_type": "usdt",
+                "network": self.network,
+                "wallet_address": self.wallet_address,
+            },
+        )
+        self.storage.save_transaction(transaction)
+        with self.transactions_lock:
+            self.transactions[transaction.id] = transaction
+        return transaction
+
     def _validate_payment_inputs(self, user_id: str, amount: float, currency: str) -> None:
         """Validate payment input parameters."""
         if not user_id or not isinstance(user_id, str):
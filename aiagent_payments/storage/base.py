@@ -149,6 +149,16 @@ class StorageBackend(ABC):
         """
         pass
 
+    def save_usage_records(self, records: List[UsageRecord]) -> None:
+        """
+        Save several usage records to storage.
+
+        The default implementation saves each record individually; backends
+        that can persist a batch in one pass should override this.
+        """
+        for record in records:
+            self.save_usage_record(record)
+
     @abstractmethod
     def get_user_usage(
         self, user_id: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
@@ -156,6 +166,16 @@ class StorageBackend(ABC):
         """Get usage records for a user within a date range."""
         pass
 
+    def get_usage_count(
+        self, user_id: str, feature: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
+    ) -> int:
+        """Count a user's usage records for a feature within a date range."""
+        return sum(1 for r in self.get_user_usage(user_id, start_date, end_date) if r.feature == feature)
+
+    def get_total_cost(self, user_id: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> float:
+        """Sum the cost of a user's usage records within a date range."""
+        return sum(r.cost or 0 for r in self.get_user_usage(user_id, start_date, end_date))
+
     @abstractmethod
     def save_transaction(self, transaction: PaymentTransaction) -> None:
         """
@@ -5,9 +5,10 @@ This backend stores all data in memory and is not persistent.
 """
 
 import logging
+import math
 import threading
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from ..exceptions import StorageError, ValidationError
 from ..models import PaymentPlan, PaymentTransaction, Subscription, UsageRecord
@@ -32,6 +33,11 @@ class MemoryStorage(StorageBackend):
         self.usage_records: Dict[str, UsageRecord] = {}
         self.transactions: Dict[str, PaymentTransaction] = {}
 
+        # Per-user index of usage records (user_id -> record_id -> record) and running
+        # usage counts, both maintained on every usage record save
+        self._usage_by_user: Dict[str, Dict[str, UsageRecord]] = {}
+        self._usage_counts: Dict[Tuple[str, str], int] = {}  # (user_id, feature) -> record count
+
         # Thread safety
         self._lock = threading.RLock()
         self._transaction_lock = threading.RLock()
@@ -127,6 +133,9 @@ class MemoryStorage(StorageBackend):
             self.user_subscriptions = transaction_data.get("user_subscriptions", {}).copy()
             self.usage_records = transaction_data.get("usage_records", {}).copy()
             self.transactions = transaction_data.get("transactions", {}).copy()
+            # The user index and counts derive from usage_records; rebuild them rather than snapshot them per transaction
+            with self._lock:
+                self._rebuild_usage_indexes()
 
             self._transaction_local.transaction_data = {}
             self._transaction_local.in_transaction = False
@@ -258,9 +267,11 @@ class MemoryStorage(StorageBackend):
         if not user_id or not isinstance(user_id, str):
             raise ValidationError("Invalid user_id", field="user_id", value=user_id)
 
+        # user_subscriptions is the user_id index; resolve it straight against the
+        # subscriptions dict rather than re-validating through get_subscription()
         subscription_id = self.user_subscriptions.get(user_id)
         if subscription_id:
-            subscription = self.get_subscription(subscription_id)
+            subscription = self.subscriptions.get(subscription_id)
             if subscription:
                 logger.debug("Retrieved active subscription for user %s: %s", user_id, subscription_id)
                 return subscription
@@ -286,7 +297,8 @@ class MemoryStorage(StorageBackend):
         # Validate the record before saving
         record.validate()
 
-        self.usage_records[record.id] = record
+        with self._lock:
+            self._store_usage_record(record)
         logger.debug(
             "Saved usage record: %s for user: %s, feature: %s",
             record.id,
@@ -294,6 +306,53 @@ class MemoryStorage(StorageBackend):
             record.feature,
         )
 
+    def _store_usage_record(self, record: UsageRecord) -> None:
+        """Store a validated usage record and update the user index and counts. Caller holds self._lock."""
+        previous = self.usage_records.get(record.id)
+        if previous is not None:
+            self._usage_by_user[previous.user_id].pop(previous.id, None)
+            self._adjust_usage_counts(previous, -1)
+        self.usage_records[record.id] = record
+        self._usage_by_user.setdefault(record.user_id, {})[record.id] = record
+        self._adjust_usage_counts(record, 1)
+
+    def _rebuild_usage_indexes(self) -> None:
+        """Recompute the user index and usage counts from usage_records. Caller holds self._lock."""
+        self._usage_by_user = {}
+        self._usage_counts = {}
+        for record in self.usage_records.values():
+            self._usage_by_user.setdefault(record.user_id, {})[record.id] = record
+            self._adjust_usage_counts(record, 1)
+
+    def _adjust_usage_counts(self, record: UsageRecord, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a record from the usage counts."""
+        key = (record.user_id, record.feature)
+        self._usage_counts[key] = self._usage_counts.get(key, 0) + sign
+
+    def save_usage_records(self, records: List[UsageRecord]) -> None:
+        """
+        Save several usage records to memory storage in one pass.
+
+        Every record is validated before any is stored, so a bad record leaves
+        the storage unchanged.
+
+        Args:
+            records: UsageRecord objects to save
+
+        Raises:
+            ValidationError: If any record is invalid
+        """
+        for record in records:
+            if not record or not isinstance(record, UsageRecord):
+                raise ValidationError("Invalid usage record object", field="record", value=record)
+            self._validate_and_save_data(record)
+            record.validate()
+
+        with self._lock:
+            for record in records:
+                self._store_usage_record(record)
+        logger.debug("Saved %d usage records", len(records))
+
     def get_user_usage(
         self, user_id: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
     ) -> List[UsageRecord]:
@@ -314,16 +373,60 @@ class MemoryStorage(StorageBackend):
         if not user_id or not isinstance(user_id, str):
             raise ValidationError("Invalid user_id", field="user_id", value=user_id)
 
-        records = [r for r in self.usage_records.values() if r.user_id == user_id]
-        if start_date:
-            records = [r for r in records if r.timestamp >= start_date]
-        if end_date:
-            records = [r for r in records if r.timestamp <= end_date]
+        user_records = self._usage_by_user.get(user_id)
+        if not user_records:
+            return []
+
+        # Filter lazily so sorted() makes the only list allocation
+        records: Iterable[UsageRecord] = user_records.values()
+        if start_date or end_date:
+            records = (
+                r for r in records if (not start_date or r.timestamp >= start_date) and (not end_date or r.timestamp <= end_date)
+            )
 
         filtered_records = sorted(records, key=lambda x: x.timestamp)
         logger.debug("Retrieved %d usage records for user %s", len(filtered_records), user_id)
         return filtered_records
 
+    def get_usage_count(
+        self, user_id: str, feature: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None
+    ) -> int:
+        """
+        Count a user's usage records for a feature.
+
+        Without a date range this is answered from the running counts.
+
+        Raises:
+            ValidationError: If the user_id is invalid
+        """
+        if start_date or end_date:
+            return super().get_usage_count(user_id, feature, start_date, end_date)
+        if not user_id or not isinstance(user_id, str):
+            raise ValidationError("Invalid user_id", field="user_id", value=user_id)
+        return self._usage_counts.get((user_id, feature), 0)
+
+    def get_total_cost(self, user_id: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None) -> float:
+        """
+        Sum the cost of a user's usage records.
+
+        Costs are summed on demand from the user index with math.fsum, so the result tracks
+        overwritten or edited records exactly and does not depend on record order.
+
+        Raises:
+            ValidationError: If the user_id is invalid
+        """
+        if not user_id or not isinstance(user_id, str):
+            raise ValidationError("Invalid user_id", field="user_id", value=user_id)
+        user_records = self._usage_by_user.get(user_id)
+        if not user_records:
+            return 0.0
+        records: Iterable[UsageRecord] = user_records.values()
+        if start_date or end_date:
+            records = (
+                r for r in records if (not start_date or r.timestamp >= start_date) and (not end_date or r.timestamp <= end_date)
+            )
+        return math.fsum(r.cost or 0.0 for r in records)
+
     def save_transaction(self, transaction: PaymentTransaction) -> None:
         """
         Save a payment transaction to memory storage.
@@ -8,12 +8,12 @@ import importlib.util
 import logging
 import random
 import re
+import string
 import time
 import uuid
-from calendar import monthrange
 from collections.abc import Callable
 from datetime import datetime, timezone
-from functools import wraps
+from functools import lru_cache, wraps
 from typing import Any, Optional, TypeVar, Union
 
 # Import SecretRedactor from logging_config for explicit redaction
@@ -103,13 +103,22 @@ if importlib.util.find_spec("web3"):
 
 DEFAULT_RETRY_EXCEPTIONS = tuple(_default_exceptions)
 
-# Static set of valid ISO 4217 codes and common stablecoins
-VALID_CURRENCIES = {"USD", "EUR", "GBP", "JPY", "CAD", "AUD", "CHF", "CNY", "SEK", "NZD", "USDC", "USDT", "DAI", "BUSD", "GUSD"}
+# Static set of valid ISO 4217 codes and common stablecoins; frozen so cached lookups cannot go stale
+VALID_CURRENCIES = frozenset(
+    {"USD", "EUR", "GBP", "JPY", "CAD", "AUD", "CHF", "CNY", "SEK", "NZD", "USDC", "USDT", "DAI", "BUSD", "GUSD"}
+)
 
 
 def generate_id(prefix: str = "") -> str:
-    """Generate a unique identifier with an optional prefix."""
-    return f"{prefix}{uuid.uuid4()}" if prefix else str(uuid.uuid4())
+    """Generate a unique identifier (a random UUID4 string) with an optional prefix."""
+    return f"{prefix}{uuid.uuid4()}"
+
+
+@lru_cache(maxsize=512)
+def _is_valid_currency_code(currency: str) -> bool:
+    """Provider-independent currency code check; memoized since callers reuse a handful of codes."""
+    # Every member is upper-case alphabetic, so membership covers the character checks; length fails fastest
+    return len(currency) == 3 and currency in VALID_CURRENCIES
 
 
 def validate_currency(currency: str, provider: Optional[Any] = None) -> bool:
@@ -125,13 +134,7 @@ def validate_currency(currency: str, provider: Optional[Any] = None) -> bool:
     Raises ValueError if provider lacks currency support information.
     """
     # Basic format validation
-    if not (
-        isinstance(currency, str)
-        and len(currency) == 3
-        and currency.isalpha()
-        and currency.isupper()
-        and currency in VALID_CURRENCIES
-    ):
+    if not (isinstance(currency, str) and _is_valid_currency_code(currency)):
         return False
 
     # Runtime provider validation if provider is provided
@@ -160,7 +163,8 @@ def validate_currency(currency: str, provider: Optional[Any] = None) -> bool:
 
 def validate_amount(amount: Union[int, float]) -> bool:
     """Return True if amount is a non-negative number."""
-    return isinstance(amount, (int, float)) and amount >= 0 and not (isinstance(amount, float) and not (amount == amount))
+    # NaN compares False against everything, so the range check also rejects it
+    return isinstance(amount, (int, float)) and amount >= 0
 
 
 def format_currency(amount: Union[int, float], currency: str = "USD", provider: Optional[Any] = None) -> str:
@@ -183,35 +187,28 @@ def format_currency(amount: Union[int, float], currency: str = "USD", provider:
         return "Invalid amount/currency"
 
 
+# Anchored at the start only (re.match); fromisoformat rejects any trailing garbage
+_ISO_DATETIME_RE = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?([+-]\d{2}:\d{2}|Z)?")
+
+
 def parse_datetime(datetime_str: str) -> Optional[datetime]:
     """Parse an ISO datetime string to a datetime object, or None if invalid."""
-    if not isinstance(datetime_str, str) or not re.match(
-        r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?([+-]\d{2}:\d{2}|Z)?", datetime_str
-    ):
+    # The shortest accepted form, YYYY-MM-DDTHH:MM:SS, is 19 characters; reject anything shorter before the regex
+    if not isinstance(datetime_str, str) or len(datetime_str) < 19:
+        return None
+    if not _ISO_DATETIME_RE.match(datetime_str):
         return None
     try:
+        # Python 3.10's fromisoformat does not accept a trailing "Z"
         dt = datetime.fromisoformat(datetime_str.replace("Z", "+00:00"))
-        # Comprehensive semantic validation with month-specific day limits
-        if (
-            dt.year < 1970
-            or dt.year > 9999
-            or dt.month < 1
-            or dt.month > 12
-            or dt.day < 1
-            or dt.day > monthrange(dt.year, dt.month)[1]
-            or dt.hour < 0
-            or dt.hour > 23
-            or dt.minute < 0
-            or dt.minute > 59
-            or dt.second < 0
-            or dt.second > 59
-        ):
-            logger.debug("Invalid datetime components: %s", redact_message(datetime_str))
-            return None
-        return dt
     except (ValueError, TypeError) as e:
         logger.debug("Invalid datetime format: %s", redact_message(str(e)))
         return None
+    # fromisoformat already enforces month, day, hour, minute and second ranges; only the epoch floor remains
+    if dt.year < 1970:
+        logger.debug("Invalid datetime components: %s", redact_message(datetime_str))
+        return None
+    return dt
 
 
 def get_current_timestamp() -> datetime:
@@ -255,10 +252,17 @@ def retry(
     if not safe_exceptions:
         raise ValueError("No retryable exceptions provided after excluding critical/logic errors")
 
+    # Backoff schedule (before jitter) for each retry, capped at max_delay; computed once per decoration
+    delays = []
+    delay = initial_delay
+    for _ in range(max_attempts - 1):
+        delays.append(delay)
+        delay = min(delay * backoff_factor, max_delay)
+    backoff_delays = tuple(delays)
+
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
-            delay = initial_delay
             last_exception = None
             for attempt in range(1, max_attempts + 1):
                 try:
@@ -279,7 +283,7 @@ def retry(
                         except Exception:
                             # If instantiation fails, re-raise the original exception
                             raise e
-                    actual_delay = min(delay, max_delay)
+                    actual_delay = backoff_delays[attempt - 1]
                     if jitter:
                         actual_delay *= 0.75 + random.random() * 0.5
                     if logger:
@@ -299,8 +303,8 @@ def retry(
                             redacted_callback_msg = redact_message(str(callback_error))
                             if logger:
                                 logger.warning("Retry callback failed: %s", redacted_callback_msg)
-                    time.sleep(actual_delay)
-                    delay *= backoff_factor
+                    if actual_delay:
+                        time.sleep(actual_delay)
             raise RuntimeError(f"Function {func.__name__} failed unexpectedly") from last_exception
 
         return wrapper
@@ -308,16 +312,29 @@ def retry(
     return decorator
 
 
+_ASCII_LETTERS = frozenset(string.ascii_letters)
+_EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + "._%+-")
+_EMAIL_DOMAIN_CHARS = frozenset(string.ascii_letters + string.digits + ".-")
+
+
 def parse_email(email: str) -> Optional[str]:
     """
     Return the email if valid, else None.
-    Input is validated against strict regex; no sensitive data is logged.
+    Input is validated against a strict character whitelist; no sensitive data is logged.
     """
     if not isinstance(email, str):
         return None
     email = email.strip()
-    # Stricter regex for email validation
-    if re.match(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", email):
+    # Single scan equivalent to ^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$
+    at = email.find("@")
+    dot = email.rfind(".")
+    if at < 1 or dot - at < 2 or len(email) - dot < 3:
+        return None
+    if (
+        _EMAIL_LOCAL_CHARS.issuperset(email[:at])
+        and _EMAIL_DOMAIN_CHARS.issuperset(email[at + 1 : dot])
+        and _ASCII_LETTERS.issuperset(email[dot + 1 :])
+    ):
         return email
     return None
 
@@ -330,20 +347,30 @@ def sanitize_string(value: Any, max_length: int = 255) -> str:
     if max_length <= 0:
         raise ValueError("max_length must be positive")
     s = str(value) if value is not None else ""
+    # ASCII is one UTF-8 byte per character, so a character slice matches the byte limit without re-encoding
+    if s.isascii():
+        return s[:max_length]
     # Unicode-safe truncation
     encoded = s.encode("utf-8")[:max_length]
     return encoded.decode("utf-8", errors="ignore")
 
 
+_MISSING = object()
+
+
+@lru_cache(maxsize=1024)
+def _split_key_path(key_path: str) -> tuple[str, ...]:
+    """Split a dotted key path; memoized because callers reuse a few constant paths."""
+    return tuple(key_path.split("."))
+
+
 def deep_get(data: dict, key_path: str, default: Any = None) -> Any:
     """Get a nested value from a dict using dot notation. Type safe."""
-    if not isinstance(data, dict):
-        return default
-    keys = key_path.split(".")
-    for key in keys:
-        if isinstance(data, dict) and key in data:
-            data = data[key]
-        else:
+    for key in _split_key_path(key_path):
+        if not isinstance(data, dict):
+            return default
+        data = data.get(key, _MISSING)
+        if data is _MISSING:
             return default
     return data
 
@@ -352,12 +379,13 @@ def deep_set(data: dict, key_path: str, value: Any) -> None:
     """Set a nested value in a dict using dot notation. Type safe."""
     if not isinstance(data, dict):
         raise ValueError("data must be a dictionary")
-    keys = key_path.split(".")
-    for key in keys[:-1]:
-        if key not in data or not isinstance(data[key], dict):
-            data[key] = {}
-        data = data[key]
-    data[keys[-1]] = value
+    *parents, leaf = _split_key_path(key_path)
+    for key in parents:
+        child = data.get(key)
+        if not isinstance(child, dict):
+            child = data[key] = {}
+        data = child
+    data[leaf] = value
 
 
 def sanitize_log_message(message: str) -> str:
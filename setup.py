@@ -50,6 +50,8 @@ setup(
             "pytest>=8.4.0",
             "pytest-cov>=4.1.0",
             "pytest-mock>=3.10.0",
+            "pytest-xdist>=3.5.0",
+            "pytest-benchmark>=4.0.0",
             "black>=25.1.0",
             "flake8>=7.0.0",
             "isort>=6.0.0",
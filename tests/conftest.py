@@ -11,6 +11,7 @@ Usage:
         assert file_storage_manager is not None
 """
 
+import logging
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -19,6 +20,40 @@ from aiagent_payments import PaymentManager
 from aiagent_payments.storage import FileStorage, MemoryStorage
 
 
+def pytest_addoption(parser):
+    parser.addoption("--run-perf", action="store_true", default=False, help="run the perf-marked throughput benchmarks")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip perf-marked tests unless run with ``--run-perf`` and pytest-benchmark is installed."""
+    if config.getoption("--run-perf") and config.pluginmanager.hasplugin("benchmark"):
+        return
+    skip_perf = pytest.mark.skip(reason="perf benchmarks are opt-in: install pytest-benchmark and run with --run-perf")
+    for item in items:
+        if item.get_closest_marker("perf") is not None:
+            item.add_marker(skip_perf)
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _silence_logs():
+    """Raise the SDK loggers to CRITICAL so save paths skip record creation during tests.
+
+    setup_logging() pins explicit levels on the SDK child loggers (aiagent_payments.storage, .core, ...),
+    so each logger in the package namespace is raised, not just the parent, and restored afterwards.
+    Loggers outside the SDK keep their levels, so pytest still captures their output for failing tests.
+    """
+    previous_levels = {
+        logger: logger.level
+        for name, logger in logging.root.manager.loggerDict.items()
+        if isinstance(logger, logging.Logger) and name.split(".")[0] == "aiagent_payments"
+    }
+    for logger in previous_levels:
+        logger.setLevel(logging.CRITICAL)
+    yield
+    for logger, level in previous_levels.items():
+        logger.setLevel(level)
+
+
 @pytest.fixture
 def payment_manager():
     """A PaymentManager instance with in-memory storage for fast, isolated tests."""
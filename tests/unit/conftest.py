@@ -0,0 +1,27 @@
+"""
+conftest.py: Fixtures shared by the unit tests.
+
+Fixtures that every test subdirectory needs live in tests/conftest.py.
+"""
+
+import pytest
+
+from aiagent_payments.models import BillingPeriod, PaymentPlan
+from aiagent_payments.storage import MemoryStorage
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_models():
+    """Touch the core models once so first-use costs are not charged to the first test."""
+    _ = BillingPeriod.MONTHLY
+    _ = PaymentPlan(id="_warm", name="Warm", price=1.0, billing_period=BillingPeriod.MONTHLY)
+    _ = MemoryStorage()
+    yield
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _devmode():
+    """Run the unit tests in SDK dev mode; set once per session (per worker under xdist) and restored afterwards."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("AIAgentPayments_DevMode", "1")
+        yield
@@ -448,6 +448,33 @@ def test_subscription_manager_direct():
     assert not manager.check_subscription_access("user1", "f")
 
 
+def test_subscription_access_follows_plan_feature_edits():
+    from aiagent_payments.core import SubscriptionManager
+
+    storage = MemoryStorage()
+    manager = SubscriptionManager(storage)
+    plan = PaymentPlan(id="pro", name="Pro", price=10.0, features=["a"])
+    storage.save_payment_plan(plan)
+    manager.create_subscription("u", "pro")
+    assert not manager.check_subscription_access("u", "b")
+
+    plan.features.append("b")
+    storage.save_payment_plan(plan)
+    assert manager.check_subscription_access("u", "b")
+
+    plan.features.remove("a")
+    storage.save_payment_plan(plan)
+    assert not manager.check_subscription_access("u", "a")
+
+    # Edits take effect without a re-save, whether in place or by reassignment
+    plan.features.append("a")
+    assert manager.check_subscription_access("u", "a")
+    plan.features = ["c"]
+    assert not manager.check_subscription_access("u", "a")
+    assert manager.check_subscription_access("u", "c")
+    assert plan.has_feature("c") and not plan.has_feature("b")
+
+
 def test_paid_feature_decorator_error_propagation():
     pm = PaymentManager()
     plan = PaymentPlan(
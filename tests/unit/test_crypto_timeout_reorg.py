@@ -57,9 +57,6 @@ class TestTimeoutValidation:
             mock_web3.return_value = mock_w3
             mock_web3.HTTPProvider.return_value = Mock()
 
-            # Set dev mode
-            os.environ["AIAgentPayments_DevMode"] = "1"
-
             provider = CryptoProvider(
                 wallet_address="0x1234567890123456789012345678901234567890", network="sepolia", storage=MemoryStorage()
             )
@@ -192,9 +189,6 @@ class TestReorgProtection:
             mock_web3.return_value = mock_w3
             mock_web3.HTTPProvider.return_value = Mock()
 
-            # Set dev mode
-            os.environ["AIAgentPayments_DevMode"] = "1"
-
             provider = CryptoProvider(
                 wallet_address="0x1234567890123456789012345678901234567890",
                 network="sepolia",
@@ -244,9 +238,6 @@ class TestReorgProtection:
             mock_web3.return_value = mock_w3
             mock_web3.HTTPProvider.return_value = Mock()
 
-            # Set dev mode
-            os.environ["AIAgentPayments_DevMode"] = "1"
-
             provider = CryptoProvider(
                 wallet_address="0x1234567890123456789012345678901234567890",
                 network="mainnet",
@@ -327,9 +318,6 @@ class TestProductionReadiness:
             mock_web3.return_value = mock_w3
             mock_web3.HTTPProvider.return_value = Mock()
 
-            # Set dev mode
-            os.environ["AIAgentPayments_DevMode"] = "1"
-
             provider = CryptoProvider(
                 wallet_address="0x1234567890123456789012345678901234567890", network="sepolia", storage=MemoryStorage()
             )
@@ -400,9 +388,6 @@ class TestIntegrationScenarios:
             mock_web3.return_value = mock_w3
             mock_web3.HTTPProvider.return_value = Mock()
 
-            # Set dev mode
-            os.environ["AIAgentPayments_DevMode"] = "1"
-
             provider = CryptoProvider(
                 wallet_address="0x1234567890123456789012345678901234567890", network="sepolia", storage=MemoryStorage()
             )
@@ -29,6 +29,9 @@ def test_payment_plan_methods():
     d = plan.to_dict()
     assert d["payment_type"] == "subscription"
     assert d["billing_period"] == "monthly"
+    assert "_feature_set" not in d
+    assert plan.has_feature("f1")
+    assert not plan.has_feature("f2")
 
 
 def test_subscription_methods():
@@ -1,7 +1,7 @@
-import json
 import os
 import tempfile
 from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 
 import pytest
 
@@ -15,6 +15,19 @@ from aiagent_payments.models import (
 from aiagent_payments.storage import DatabaseStorage, FileStorage, MemoryStorage, StorageBackend
 
 
+@pytest.fixture
+def file_storage(tmp_path):
+    """A FileStorage rooted in tmp_path, plus pre-bound paths to its JSON files."""
+    paths = SimpleNamespace(
+        root=tmp_path,
+        plans=tmp_path / "payment_plans.json",
+        subscriptions=tmp_path / "subscriptions.json",
+        usage=tmp_path / "usage_records.json",
+        transactions=tmp_path / "transactions.json",
+    )
+    return FileStorage(str(tmp_path)), paths
+
+
 def test_memory_storage_initialization():
     storage = MemoryStorage()
     assert storage is not None
@@ -46,7 +59,7 @@ def test_memory_storage_payment_plans():
 
     plans = storage.list_payment_plans()
     assert len(plans) == 2
-    plan_ids = [p.id for p in plans]
+    plan_ids = {p.id for p in plans}
     assert "test_plan" in plan_ids
     assert "test_plan2" in plan_ids
 
@@ -96,6 +109,64 @@ def test_memory_storage_usage_records():
     assert len(user_records_filtered) == 0  # Records created before start_date
 
 
+def test_memory_storage_save_usage_records():
+    storage = MemoryStorage()
+
+    records = [
+        UsageRecord(id="batch_record1", user_id="user1", feature="test_feature", cost=0.5),
+        UsageRecord(id="batch_record2", user_id="user1", feature="test_feature2", cost=0.3),
+    ]
+    storage.save_usage_records(records)
+    assert len(storage.get_user_usage("user1")) == 2
+
+    # An invalid entry rejects the whole batch
+    with pytest.raises(ValidationError):
+        storage.save_usage_records([UsageRecord(id="batch_record3", user_id="user2", feature="f"), None])  # type: ignore
+    assert storage.get_user_usage("user2") == []
+
+
+def test_memory_storage_usage_aggregates():
+    storage = MemoryStorage()
+
+    storage.save_usage_record(UsageRecord(id="agg1", user_id="user1", feature="f", cost=2.0))
+    storage.save_usage_record(UsageRecord(id="agg2", user_id="user1", feature="f", cost=3.0))
+    assert storage.get_usage_count("user1", "f") == 2
+    assert storage.get_total_cost("user1") == 5.0
+
+    # Re-saving an existing record replaces its contribution
+    storage.save_usage_record(UsageRecord(id="agg2", user_id="user1", feature="g", cost=1.0))
+    assert storage.get_usage_count("user1", "f") == 1
+    assert storage.get_usage_count("user1", "g") == 1
+    assert storage.get_total_cost("user1") == 3.0
+
+    # Rolled-back saves do not leak into the aggregates
+    storage.begin_transaction()
+    storage.save_usage_record(UsageRecord(id="agg3", user_id="user1", feature="f", cost=4.0))
+    storage.rollback()
+    assert storage.get_usage_count("user1", "f") == 1
+    assert storage.get_total_cost("user1") == 3.0
+    assert {r.id for r in storage.get_user_usage("user1")} == {"agg1", "agg2"}
+
+    # Re-saving a record under another user moves it between users
+    storage.save_usage_record(UsageRecord(id="agg2", user_id="user2", feature="g", cost=1.0))
+    assert [r.id for r in storage.get_user_usage("user1")] == ["agg1"]
+    assert [r.id for r in storage.get_user_usage("user2")] == ["agg2"]
+
+
+def test_memory_storage_total_cost_matches_ranged_scan():
+    storage = MemoryStorage()
+    storage.save_usage_record(UsageRecord(id="c1", user_id="user1", feature="f", cost=0.1))
+    storage.save_usage_record(UsageRecord(id="c2", user_id="user1", feature="f", cost=0.2))
+    # Moving a record to another user must not leave float residue in the first user's total
+    storage.save_usage_record(UsageRecord(id="c2", user_id="user2", feature="f", cost=0.7))
+    wide = datetime(2000, 1, 1, tzinfo=timezone.utc)
+    assert storage.get_total_cost("user1") == storage.get_total_cost("user1", start_date=wide) == 0.1
+
+    # Costs edited on a stored record are picked up without a re-save
+    storage.get_user_usage("user2")[0].cost = 0.5
+    assert storage.get_total_cost("user2") == storage.get_total_cost("user2", start_date=wide) == 0.5
+
+
 def test_memory_storage_transactions():
     storage = MemoryStorage()
 
@@ -121,141 +192,127 @@ def test_memory_storage_transactions():
     assert storage.get_transaction("nonexistent") is None
 
 
-def test_file_storage_initialization():
-    with tempfile.TemporaryDirectory() as temp_dir:
-        storage = FileStorage(temp_dir)
-        assert storage is not None
-        assert storage.data_dir == temp_dir
-        # Files are created when first data is saved, not on initialization
-        # Test that files can be created
-        plan = PaymentPlan(id="test_plan", name="Test Plan", price=10.0)
-        storage.save_payment_plan(plan)
-        assert os.path.exists(os.path.join(temp_dir, "payment_plans.json"))
+def test_file_storage_initialization(file_storage):
+    storage, paths = file_storage
+    assert storage is not None
+    assert storage.data_dir == str(paths.root)
+    # Files are created when first data is saved, not on initialization
+    # Test that files can be created
+    plan = PaymentPlan(id="test_plan", name="Test Plan", price=10.0)
+    storage.save_payment_plan(plan)
+    assert paths.plans.exists()
 
 
-def test_file_storage_payment_plans():
-    with tempfile.TemporaryDirectory() as temp_dir:
-        storage = FileStorage(temp_dir)
+def test_file_storage_payment_plans(file_storage):
+    storage, paths = file_storage
 
-        # Test save and get payment plan
-        plan = PaymentPlan(id="test_plan", name="Test Plan", price=10.0)
-        storage.save_payment_plan(plan)
-
-        retrieved = storage.get_payment_plan("test_plan")
-        assert retrieved is not None
-        assert retrieved.id == "test_plan"
-        assert retrieved.name == "Test Plan"
-        assert retrieved.price == 10.0
+    # Test save and get payment plan
+    plan = PaymentPlan(id="test_plan", name="Test Plan", price=10.0)
+    storage.save_payment_plan(plan)
 
-        # Test get non-existent plan
-        assert storage.get_payment_plan("nonexistent") is None
+    retrieved = storage.get_payment_plan("test_plan")
+    assert retrieved is not None
+    assert retrieved.id == "test_plan"
+    assert retrieved.name == "Test Plan"
+    assert retrieved.price == 10.0
 
-        # Test list payment plans
-        plan2 = PaymentPlan(id="test_plan2", name="Test Plan 2", price=20.0)
-        storage.save_payment_plan(plan2)
+    # Test get non-existent plan
+    assert storage.get_payment_plan("nonexistent") is None
 
-        plans = storage.list_payment_plans()
-        assert len(plans) == 2
+    # Test list payment plans
+    plan2 = PaymentPlan(id="test_plan2", name="Test Plan 2", price=20.0)
+    storage.save_payment_plan(plan2)
 
-        # Verify files are created
-        plan_file = os.path.join(temp_dir, "payment_plans.json")
-        assert os.path.exists(plan_file)
+    plans = storage.list_payment_plans()
+    assert len(plans) == 2
 
-        with open(plan_file) as f:
-            data = json.load(f)
-            assert len(data) == 2
+    # Verify files are created; contents were already checked via list_payment_plans()
+    assert paths.plans.stat().st_size > 0
 
 
-def test_file_storage_subscriptions():
-    with tempfile.TemporaryDirectory() as temp_dir:
-        storage = FileStorage(temp_dir)
+def test_file_storage_subscriptions(file_storage):
+    storage, _ = file_storage
 
-        # Test save and get subscription
-        sub = Subscription(id="test_sub", user_id="user1", plan_id="test_plan", status="active")
-        storage.save_subscription(sub)
+    # Test save and get subscription
+    sub = Subscription(id="test_sub", user_id="user1", plan_id="test_plan", status="active")
+    storage.save_subscription(sub)
 
-        retrieved = storage.get_subscription("test_sub")
-        assert retrieved is not None
-        assert retrieved.id == "test_sub"
-        assert retrieved.user_id == "user1"
+    retrieved = storage.get_subscription("test_sub")
+    assert retrieved is not None
+    assert retrieved.id == "test_sub"
+    assert retrieved.user_id == "user1"
 
-        # Test get user subscription
-        user_sub = storage.get_user_subscription("user1")
-        assert user_sub is not None
-        assert user_sub.id == "test_sub"
+    # Test get user subscription
+    user_sub = storage.get_user_subscription("user1")
+    assert user_sub is not None
+    assert user_sub.id == "test_sub"
 
 
-def test_file_storage_usage_records():
-    with tempfile.TemporaryDirectory() as temp_dir:
-        storage = FileStorage(temp_dir)
+def test_file_storage_usage_records(file_storage):
+    storage, _ = file_storage
 
-        # Test save usage record
-        record = UsageRecord(id="test_record", user_id="user1", feature="test_feature", cost=0.5)
-        storage.save_usage_record(record)
+    # Test save usage record
+    record = UsageRecord(id="test_record", user_id="user1", feature="test_feature", cost=0.5)
+    storage.save_usage_record(record)
 
-        # Test get user usage
-        record2 = UsageRecord(id="test_record2", user_id="user1", feature="test_feature2", cost=0.3)
-        storage.save_usage_record(record2)
+    # Test get user usage
+    record2 = UsageRecord(id="test_record2", user_id="user1", feature="test_feature2", cost=0.3)
+    storage.save_usage_record(record2)
 
-        user_records = storage.get_user_usage("user1")
-        assert len(user_records) == 2
+    user_records = storage.get_user_usage("user1")
+    assert len(user_records) == 2
 
 
-def test_file_storage_transactions():
-    with tempfile.TemporaryDirectory() as temp_dir:
-        storage = FileStorage(temp_dir)
+def test_file_storage_transactions(file_storage):
+    storage, _ = file_storage
 
-        # Test save and get transaction
-        transaction = PaymentTransaction(
-            id="test_transaction",
-            user_id="user1",
-            amount=10.0,
-            currency="USD",
-            payment_method="stripe",
-            status="completed",
-        )
-        storage.save_transaction(transaction)
+    # Test save and get transaction
+    transaction = PaymentTransaction(
+        id="test_transaction",
+        user_id="user1",
+        amount=10.0,
+        currency="USD",
+        payment_method="stripe",
+        status="completed",
+    )
+    storage.save_transaction(transaction)
 
-        retrieved = storage.get_transaction("test_transaction")
-        assert retrieved is not None
-        assert retrieved.id == "test_transaction"
-        assert retrieved.user_id == "user1"
-        assert retrieved.amount == 10.0
+    retrieved = storage.get_transaction("test_transaction")
+    assert retrieved is not None
+    assert retrieved.id == "test_transaction"
+    assert retrieved.user_id == "user1"
+    assert retrieved.amount == 10.0
 
 
-def test_file_storage_persistence():
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Create storage and add data
-        storage1 = FileStorage(temp_dir)
-        plan = PaymentPlan(id="test_plan", name="Test Plan", price=10.0)
-        storage1.save_payment_plan(plan)
+def test_file_storage_persistence(file_storage):
+    # Create storage and add data
+    storage1, paths = file_storage
+    plan = PaymentPlan(id="test_plan", name="Test Plan", price=10.0)
+    storage1.save_payment_plan(plan)
 
-        # Create new storage instance (simulates restart)
-        storage2 = FileStorage(temp_dir)
+    # Create new storage instance (simulates restart)
+    storage2 = FileStorage(str(paths.root))
 
-        # Data should persist
-        retrieved = storage2.get_payment_plan("test_plan")
-        assert retrieved is not None
-        assert retrieved.id == "test_plan"
+    # Data should persist
+    retrieved = storage2.get_payment_plan("test_plan")
+    assert retrieved is not None
+    assert retrieved.id == "test_plan"
 
 
-def test_file_storage_error_handling():
-    with tempfile.TemporaryDirectory() as temp_dir:
-        storage = FileStorage(temp_dir)
+def test_file_storage_error_handling(file_storage):
+    _, paths = file_storage
 
-        # Test with invalid data directory
-        with pytest.raises(Exception):
-            FileStorage("/nonexistent/directory")
+    # Test with invalid data directory
+    with pytest.raises(Exception):
+        FileStorage("/nonexistent/directory")
 
-        # Test with corrupted JSON file
-        plan_file = os.path.join(temp_dir, "payment_plans.json")
-        with open(plan_file, "w") as f:
-            f.write("invalid json")
+    # Test with corrupted JSON file
+    paths.plans.write_text("invalid json")
 
-        # Should handle corrupted file gracefully
-        storage = FileStorage(temp_dir)
-        plans = storage.list_payment_plans()
-        assert len(plans) == 0
+    # Should handle corrupted file gracefully
+    storage = FileStorage(str(paths.root))
+    plans = storage.list_payment_plans()
+    assert len(plans) == 0
 
 
 def test_storage_backend_abstract_methods():
@@ -288,16 +345,15 @@ def test_memory_storage_edge_cases():
     assert storage.get_transaction("") is None
 
 
-def test_file_storage_edge_cases():
-    with tempfile.TemporaryDirectory() as temp_dir:
-        storage = FileStorage(temp_dir)
+def test_file_storage_edge_cases(file_storage):
+    storage, _ = file_storage
 
-        # Test with None values (should raise ValidationError)
-        with pytest.raises(ValidationError):
-            storage.save_payment_plan(None)  # type: ignore
+    # Test with None values (should raise ValidationError)
+    with pytest.raises(ValidationError):
+        storage.save_payment_plan(None)  # type: ignore
 
-        with pytest.raises(ValidationError):
-            storage.save_subscription(None)  # type: ignore
+    with pytest.raises(ValidationError):
+        storage.save_subscription(None)  # type: ignore
 
 
 def test_subscription_status_handling():
@@ -345,18 +401,15 @@ def test_usage_records_date_filtering():
     assert len(filtered_records) == 0
 
 
-def test_file_storage_error_handling_corruption():
-    with tempfile.TemporaryDirectory() as temp_dir:
-        storage = FileStorage(temp_dir)
+def test_file_storage_error_handling_corruption(file_storage):
+    storage, paths = file_storage
 
-        # Test with corrupted JSON file
-        plan_file = os.path.join(temp_dir, "payment_plans.json")
-        with open(plan_file, "w") as f:
-            f.write("invalid json content")
+    # Test with corrupted JSON file
+    paths.plans.write_text("invalid json content")
 
-        # Should handle gracefully
-        plans = storage.list_payment_plans()
-        assert isinstance(plans, list)
+    # Should handle gracefully
+    plans = storage.list_payment_plans()
+    assert isinstance(plans, list)
 
 
 def test_database_storage_initialization():
@@ -76,26 +76,18 @@ class TestTimeoutValidationLogic:
 class TestReorgProtectionLogic:
     """Test reorg protection logic without importing CryptoProvider."""
 
-    def test_safety_margin_calculation(self):
-        """Test safety margin calculation logic."""
-        base_confirmations = 6
-        safety_margin = 5
-        effective_confirmations = base_confirmations + safety_margin
-
-        assert effective_confirmations == 11
-        assert safety_margin == 5
-
-    def test_mainnet_safety_margin(self):
-        """Test mainnet safety margin calculation."""
-        base_confirmations = 24  # Mainnet default
-        safety_margin = 5
-        effective_confirmations = base_confirmations + safety_margin
-
-        assert effective_confirmations == 29
-        assert safety_margin == 5
-
-    def test_reorg_risk_assessment(self):
-        """Test reorg risk assessment logic."""
+    @pytest.mark.parametrize(
+        "base_confirmations,safety_margin,expected_effective,expected_risk",
+        [
+            (6, 5, 11, "HIGH"),  # Testnet with safety margin
+            (24, 5, 29, "LOW"),  # Mainnet default with safety margin
+            (19, 5, 24, "LOW"),  # Boundary of the low-risk band
+            (12, 5, 17, "MODERATE"),  # Middle band
+            (6, 0, 6, "HIGH"),  # Low confirmations
+        ],
+    )
+    def test_safety_margin_and_reorg_risk(self, base_confirmations, safety_margin, expected_effective, expected_risk):
+        """Test safety margin calculation and the resulting reorg risk assessment."""
 
         def assess_risk(effective_confirmations):
             if effective_confirmations >= 24:
@@ -105,10 +97,10 @@ class TestReorgProtectionLogic:
             else:
                 return "HIGH"
 
-        # Test risk assessments
-        assert assess_risk(29) == "LOW"  # Mainnet with safety margin
-        assert assess_risk(11) == "HIGH"  # Testnet with safety margin - corrected expectation
-        assert assess_risk(6) == "HIGH"  # Low confirmations
+        effective_confirmations = base_confirmations + safety_margin
+
+        assert effective_confirmations == expected_effective
+        assert assess_risk(effective_confirmations) == expected_risk
 
     def test_reorg_protection_metadata(self):
         """Test reorg protection metadata structure."""
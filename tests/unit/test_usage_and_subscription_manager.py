@@ -1,3 +1,4 @@
+import itertools
 from datetime import datetime, timedelta, timezone
 from typing import Any, cast
 
@@ -9,8 +10,49 @@ from aiagent_payments.models import BillingPeriod, PaymentPlan
 from aiagent_payments.storage import MemoryStorage
 
 
-def test_usage_tracker_record_and_get():
-    storage = MemoryStorage()
+@pytest.fixture(scope="module")
+def make_storage():
+    """Storage factory resolved once per module; each call returns a fresh backend."""
+    return MemoryStorage
+
+
+@pytest.fixture
+def storage(make_storage):
+    return make_storage()
+
+
+@pytest.fixture
+def manager(storage):
+    return SubscriptionManager(storage)
+
+
+@pytest.fixture
+def plan(storage, request):
+    """Plan "p1" saved to the test's storage.
+
+    Parametrize indirectly to choose the plan features (defaults to none).
+    """
+    features = list(getattr(request, "param", ()))
+    p = PaymentPlan(id="p1", name="P1", price=10.0, billing_period=BillingPeriod.MONTHLY, features=features)
+    storage.save_payment_plan(p)
+    return p
+
+
+@pytest.fixture
+def fixed_clock():
+    """Clock that always returns the same instant, avoiding a datetime.now() per call."""
+    now = datetime.now(timezone.utc)
+    return lambda: now
+
+
+@pytest.fixture
+def sequential_ids():
+    """Id factory yielding id1, id2, ... instead of drawing UUIDs."""
+    counter = itertools.count(1)
+    return lambda: f"id{next(counter)}"
+
+
+def test_usage_tracker_record_and_get(storage):
     tracker = UsageTracker(storage)
     record = tracker.record_usage("user1", "feature1", 1.5, {"meta": 1})
     assert record.user_id == "user1"
@@ -21,63 +63,100 @@ def test_usage_tracker_record_and_get():
     assert records[0].feature == "feature1"
 
 
-def test_usage_tracker_count_and_total():
-    storage = MemoryStorage()
+@pytest.mark.parametrize(
+    "items,expected_count_f,expected_total",
+    [
+        ([("f", 2.0), ("f", 3.0), ("g", 1.0)], 2, 6.0),
+        ([("g", 1.5)], 0, 1.5),
+        ([("f", None), ("f", 4.0)], 2, 4.0),
+    ],
+    ids=["mixed", "no-f", "free-usage"],
+)
+def test_usage_tracker_count_and_total(storage, items, expected_count_f, expected_total):
     tracker = UsageTracker(storage)
-    tracker.record_usage("user1", "f", 2.0)
-    tracker.record_usage("user1", "f", 3.0)
-    tracker.record_usage("user1", "g", 1.0)
-    assert tracker.get_usage_count("user1", "f") == 2
-    assert tracker.get_total_cost("user1") == 6.0
+    records = tracker.record_usage_batch("user1", items)
+    assert len(records) == len(items)
+    assert tracker.get_usage_count("user1", "f") == expected_count_f
+    assert tracker.get_total_cost("user1") == expected_total
 
 
-def test_usage_tracker_validation():
-    storage = MemoryStorage()
+def test_usage_tracker_batch_validation(storage):
     tracker = UsageTracker(storage)
     with pytest.raises(ValidationError):
-        tracker.record_usage("user1", "", 1.0)
+        tracker.record_usage_batch("user1", [("f", 1.0), ("", 1.0)])
+    assert tracker.get_user_usage("user1") == []
+
+
+@pytest.mark.parametrize("feature,metadata", [("", None), ("f", "notadict")], ids=["empty-feature", "non-dict-metadata"])
+def test_usage_tracker_validation(storage, feature, metadata):
+    # The non-dict metadata case exercises the debug-only runtime check (stripped under python -O)
+    tracker = UsageTracker(storage)
     with pytest.raises(ValidationError):
-        tracker.record_usage("user1", "f", 1.0, metadata=cast(Any, "notadict"))
+        tracker.record_usage("user1", feature, 1.0, metadata=cast(Any, metadata))
 
 
-def test_subscription_manager_create_and_get():
-    storage = MemoryStorage()
-    plan = PaymentPlan(id="p1", name="P1", price=10.0, billing_period=BillingPeriod.MONTHLY)
-    storage.save_payment_plan(plan)
-    manager = SubscriptionManager(storage)
-    sub = manager.create_subscription("user1", "p1")
+@pytest.mark.parametrize("metadata", ["notadict", 5, [("a", 1)]], ids=["str", "int", "pair-list"])
+def test_make_record_rejects_non_mapping_metadata(storage, metadata):
+    # Mirrors record_usage under python -O, where _validate_inputs skips the Mapping check
+    tracker = UsageTracker(storage)
+    with pytest.raises(ValidationError):
+        tracker._make_record("user1", "f", 1.0, cast(Any, metadata), datetime.now(timezone.utc))
+
+
+@pytest.mark.perf
+def test_record_usage_benchmark(benchmark, storage):
+    """Guard record_usage throughput; an accidental linear scan per call would blow the budget."""
+    tracker = UsageTracker(storage)
+
+    def record_batch():
+        for _ in range(1000):
+            tracker.record_usage("u", "f", 1.0)
+
+    benchmark.pedantic(record_batch, rounds=10, iterations=5)
+    # Budget per 1000 calls; generous for slow CI, far below what a per-call scan of 50k records costs
+    assert benchmark.stats.stats.mean < 1.0
+    assert tracker.get_usage_count("u", "f") == 50_000
+
+
+def test_subscription_manager_create_and_get(manager, plan):
+    sub = manager.create_subscription("user1", plan.id)
     assert sub is not None
     assert sub.user_id == "user1"
-    assert sub.plan_id == "p1"
+    assert sub.plan_id == plan.id
     got = manager.get_user_subscription("user1")
     assert got is not None
     assert got.id == sub.id
 
 
-def test_subscription_manager_cancel_and_renew():
-    storage = MemoryStorage()
-    plan = PaymentPlan(id="p1", name="P1", price=10.0, billing_period=BillingPeriod.MONTHLY)
-    storage.save_payment_plan(plan)
-    manager = SubscriptionManager(storage)
-    manager.create_subscription("user1", "p1")
+def test_subscription_manager_cancel_and_renew(manager, plan):
+    manager.create_subscription("user1", plan.id)
     assert manager.cancel_subscription("user1")
     assert not manager.cancel_subscription("user2")
     # Renew after cancel
-    manager.create_subscription("user1", "p1")
+    manager.create_subscription("user1", plan.id)
     renewed = manager.renew_subscription("user1")
     assert renewed is not None
     assert renewed.status == "active"
 
 
-def test_subscription_manager_access_and_errors():
-    storage = MemoryStorage()
-    plan = PaymentPlan(id="p1", name="P1", price=10.0, billing_period=BillingPeriod.MONTHLY, features=["f1"])
-    storage.save_payment_plan(plan)
-    manager = SubscriptionManager(storage)
-    manager.create_subscription("user1", "p1")
+@pytest.mark.parametrize("plan", [["f1"]], indirect=True)
+def test_subscription_manager_access_and_errors(manager, plan):
+    manager.create_subscription("user1", plan.id)
     assert manager.check_subscription_access("user1", "f1")
     assert not manager.check_subscription_access("user1", "f2")
     assert not manager.check_subscription_access("user2", "f1")
     # Error on missing plan
     with pytest.raises(ConfigurationError):
         manager.create_subscription("user1", "missing")
+
+
+def test_injected_clock_and_id_factory(storage, plan, fixed_clock, sequential_ids):
+    tracker = UsageTracker(storage, clock=fixed_clock, id_factory=sequential_ids)
+    manager = SubscriptionManager(storage, clock=fixed_clock, id_factory=sequential_ids)
+    record = tracker.record_usage("user1", "f", 1.0)
+    sub = manager.create_subscription("user1", plan.id)
+    assert record.id == "id1"
+    assert record.timestamp == fixed_clock()
+    assert sub.id == "id2"
+    assert sub.start_date == fixed_clock()
+    assert sub.current_period_end == fixed_clock() + timedelta(days=30)
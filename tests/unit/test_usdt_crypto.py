@@ -13,18 +13,20 @@ Author: AI Agent Payments Team
 Version: 0.0.1b1
 """
 
+import contextlib
+import copy
+import importlib.util
 import os
+import re
 import sys
 import types
-from datetime import datetime, timedelta
-from decimal import Decimal
-from unittest.mock import MagicMock, Mock, patch
+from datetime import timedelta
+from unittest.mock import patch
 
 import pytest
 
 from aiagent_payments.exceptions import (
     ConfigurationError,
-    PaymentFailed,
     ProviderError,
     ValidationError,
 )
@@ -36,57 +38,167 @@ from aiagent_payments.providers.crypto import (
 )
 from aiagent_payments.storage import MemoryStorage
 
+# USDT contract address used for every network in these tests; read-only so no test can mutate it
+USDT_ADDR = "0xdAC17F958D2ee523a2206206994597C13D831ec7"
+test_usdt_contracts = types.MappingProxyType({"mainnet": USDT_ADDR, "sepolia": USDT_ADDR})
+
 # Patch USDT_CONTRACTS globally for all tests in this file
 pytestmark = pytest.mark.usefixtures("patch_usdt_contracts")
 
 
 @pytest.fixture(autouse=True, scope="module")
 def patch_usdt_contracts():
-    with patch.dict(
-        USDT_CONTRACTS,
-        {"mainnet": "0xdAC17F958D2ee523a2206206994597C13D831ec7", "sepolia": "0xdAC17F958D2ee523a2206206994597C13D831ec7"},
-    ):
+    with patch.dict(USDT_CONTRACTS, test_usdt_contracts):
         yield
 
 
-@pytest.fixture
-def mock_web3():
-    """Mock web3 connection."""
-    import sys
-    import types
-    from unittest.mock import Mock, patch
-
-    # Create a mock web3 instance
-    mock_w3 = Mock()
-    mock_w3.is_connected.return_value = True
-    mock_w3.is_address.return_value = True
-    mock_w3.to_checksum_address.side_effect = lambda addr: addr
+class _FakeWeb3Disconnected:
+    """Web3 stand-in whose connection check fails."""
+
+    def __init__(self, *args, **kwargs):
+        self.eth = types.SimpleNamespace(chain_id=11155111, contract=lambda *a, **k: _FakeContract(USDT_ADDR))
+
+    def is_connected(self):
+        return False
+
+    @staticmethod
+    def to_checksum_address(addr):
+        return addr
+
+    @staticmethod
+    def HTTPProvider(*args, **kwargs):
+        return types.SimpleNamespace()
+
+
+class _FakeWeb3WrongChain(_FakeWeb3Disconnected):
+    """Web3 stand-in connected to an unexpected chain."""
+
+    def __init__(self, *args, **kwargs):
+        self.eth = types.SimpleNamespace(chain_id=999, contract=lambda *a, **k: _FakeContract(USDT_ADDR))
+
+    def is_connected(self):
+        return True
+
+
+# Fake web3 modules built once; tests install them with monkeypatch.setitem(sys.modules, ...)
+_DISCONNECTED_WEB3_MODULE = types.ModuleType("web3")
+_DISCONNECTED_WEB3_MODULE.Web3 = _FakeWeb3Disconnected  # type: ignore
+_WRONG_CHAIN_WEB3_MODULE = types.ModuleType("web3")
+_WRONG_CHAIN_WEB3_MODULE.Web3 = _FakeWeb3WrongChain  # type: ignore
+
+
+# Default contract call results; balanceOf is 1000 USDT in wei
+_CONTRACT_DEFAULTS = {"decimals": 6, "symbol": "USDT", "name": "Tether USD", "balanceOf": 1000000000}
+
+
+class _FakeCall:
+    """Bound contract function: ``call()`` returns ``value``, or raises ``error`` when set."""
+
+    def __init__(self, value):
+        self.value = value
+        self.error = None
+
+    def call(self):
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class _FakeFunctions:
+    """The ``contract.functions`` namespace the provider reads."""
+
+    def __init__(self):
+        self.calls = {name: _FakeCall(value) for name, value in _CONTRACT_DEFAULTS.items()}
+
+    def decimals(self):
+        return self.calls["decimals"]
+
+    def symbol(self):
+        return self.calls["symbol"]
+
+    def name(self):
+        return self.calls["name"]
+
+    def balanceOf(self, address):
+        return self.calls["balanceOf"]
+
+
+class _FakeTransferEvent:
+    """``contract.events.Transfer``; filters return ``entries`` regardless of their arguments."""
+
+    def __init__(self):
+        self.entries = []
+
+    def create_filter(self, *args, **kwargs):
+        return self
+
+    def get_all_entries(self):
+        return list(self.entries)
+
+
+class _FakeContract:
+    """Plain-object USDT contract; far cheaper to call into than a Mock tree."""
+
+    def __init__(self, address):
+        self.address = address
+        self.functions = _FakeFunctions()
+        self.events = types.SimpleNamespace(Transfer=_FakeTransferEvent())
+
+
+class _FakeEth:
+    """``w3.eth`` with only the attributes CryptoProvider reads; a misspelled override raises AttributeError."""
+
+    __slots__ = (
+        "contract",
+        "chain_id",
+        "block_number",
+        "gas_price",
+        "get_block",
+        "get_transaction",
+        "get_transaction_receipt",
+        "uninstall_filter",
+    )
+
+    def __init__(self, contract):
+        self.contract = lambda *args, **kwargs: contract
+        # Receipts, transactions and filters are never overridden by tests
+        self.get_transaction_receipt = lambda *args, **kwargs: {"status": 1}
+        self.get_transaction = lambda *args, **kwargs: {"gasPrice": 20000000000}
+        self.uninstall_filter = lambda *args, **kwargs: True
+
+
+class _FakeWeb3:
+    """Slotted stand-in for a ``Web3`` instance; _configure_mock_web3 applies the overridable defaults."""
+
+    __slots__ = ("eth", "is_connected", "is_address", "to_checksum_address", "from_wei")
+
+    def __init__(self, contract):
+        self.eth = _FakeEth(contract)
+        self.from_wei = lambda *args, **kwargs: 20.0
+
+
+def _configure_mock_web3(mock_w3, mock_contract):
+    """Apply the default return values that individual tests are allowed to override."""
+    mock_w3.is_connected = lambda: True
+    mock_w3.is_address = lambda addr: True
+    mock_w3.to_checksum_address = lambda addr: addr
     mock_w3.eth.chain_id = 11155111  # Sepolia
     mock_w3.eth.block_number = 1000000
     mock_w3.eth.gas_price = 20000000000  # 20 gwei
-    mock_w3.from_wei.return_value = 20.0
-
-    # Mock contract with proper method chaining
-    mock_contract = Mock()
-    mock_contract.functions.decimals.return_value.call.return_value = 6
-    mock_contract.functions.symbol.return_value.call.return_value = "USDT"
-    mock_contract.functions.name.return_value.call.return_value = "Tether USD"
-    mock_contract.address = test_usdt_contracts["sepolia"]
-
-    # Mock balanceOf method
-    mock_balance_of = Mock()
-    mock_balance_of.call.return_value = 1000000000  # 1000 USDT in wei
-    mock_contract.functions.balanceOf.return_value = mock_balance_of
+    mock_w3.eth.get_block = lambda *args, **kwargs: {"hash": b""}
 
-    # Mock transfer events
-    mock_contract.events.Transfer.create_filter.return_value.get_all_entries.return_value = []
+    for name, value in _CONTRACT_DEFAULTS.items():
+        mock_contract.functions.calls[name].value = value
+        mock_contract.functions.calls[name].error = None
+    mock_contract.events.Transfer.entries = []
 
-    mock_w3.eth.contract.return_value = mock_contract
 
-    # Mock get_transaction_receipt().get('status') to return 1 (success)
-    mock_receipt = Mock()
-    mock_receipt.get.return_value = 1
-    mock_w3.eth.get_transaction_receipt.return_value = mock_receipt
+@pytest.fixture(scope="session")
+def _mock_web3_template():
+    """Build the mock web3 tree and fake ``web3`` module once per session."""
+    mock_contract = _FakeContract(test_usdt_contracts["sepolia"])
+    mock_w3 = _FakeWeb3(mock_contract)
+    _configure_mock_web3(mock_w3, mock_contract)
 
     # Create a mock Web3 class that returns our mock instance
     class MockWeb3:
@@ -102,113 +214,173 @@ def mock_web3():
 
         @staticmethod
         def HTTPProvider(*args, **kwargs):
-            return Mock()
+            return types.SimpleNamespace()
 
         @staticmethod
         def is_address(addr):
             return True
 
-    # Patch sys.modules['web3'] for the duration of the test
     mock_web3_module = types.ModuleType("web3")
     mock_web3_module.Web3 = MockWeb3  # type: ignore
-    sys.modules["web3"] = mock_web3_module
+    return mock_w3, mock_contract, mock_web3_module
+
+
+@contextlib.contextmanager
+def _override(target, **attrs):
+    """Temporarily set attributes on part of the shared mock web3 tree, restoring them on exit."""
+    originals = {name: getattr(target, name) for name in attrs}
+    for name, value in attrs.items():
+        setattr(target, name, value)
+    try:
+        yield target
+    finally:
+        for name, value in originals.items():
+            setattr(target, name, value)
+
+
+@contextlib.contextmanager
+def _installed_web3(mock_web3_template):
+    """Install the fake web3 module with default mock values while a provider is built."""
+    mock_w3, mock_contract, mock_web3_module = mock_web3_template
+    _configure_mock_web3(mock_w3, mock_contract)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setitem(sys.modules, "web3", mock_web3_module)
+        yield
+
+
+class _NoopStorage:
+    """Stateless storage for tests that never persist transactions; has only the methods CryptoProvider requires."""
+
+    def save_transaction(self, transaction):
+        pass
+
+    def get_transaction(self, transaction_id):
+        return None
+
+    def list_transactions(self, *args, **kwargs):
+        return []
+
+
+_NOOP_STORAGE = _NoopStorage()
+
+
+@pytest.fixture(autouse=True)
+def _reset_provider(request):
+    """Give each test using a shared provider the mocked web3 and empty transaction state.
 
+    Tests marked ``noop_storage`` get the shared no-op storage instead of a fresh MemoryStorage.
+    """
+    if "provider" not in request.fixturenames:
+        yield
+        return
+    provider = request.getfixturevalue("provider")
+    request.getfixturevalue("mock_web3")
+    provider.storage = _NOOP_STORAGE if request.node.get_closest_marker("noop_storage") else MemoryStorage()
+    provider.transactions.clear()
+    yield
+
+
+@pytest.fixture
+def mock_web3(_mock_web3_template, monkeypatch):
+    """Mock web3 connection, reset to its defaults for each test."""
+    mock_w3, mock_contract, mock_web3_module = _mock_web3_template
+    _configure_mock_web3(mock_w3, mock_contract)
+    # Install the fake module for the duration of the test
+    monkeypatch.setitem(sys.modules, "web3", mock_web3_module)
     yield mock_w3
 
 
 @pytest.fixture
-def provider():
-    """Create a CryptoProvider instance for testing."""
-    from aiagent_payments.providers import crypto
-
-    # Create a mock web3 instance
-    mock_w3 = Mock()
-    mock_w3.is_connected.return_value = True
-    mock_w3.eth.chain_id = 1  # Mainnet
-    mock_w3.eth.block_number = 10000000
-    mock_w3.eth.gas_price = 20000000000  # 20 gwei
-    mock_w3.to_checksum_address.return_value = "0x1234567890123456789012345678901234567890"
-    mock_w3.is_address.return_value = True
-    mock_w3.from_wei.return_value = 20.0
+def mock_contract(_mock_web3_template, mock_web3):
+    """The pre-built fake USDT contract, reset with mock_web3; tests override only the leaf call values."""
+    return _mock_web3_template[1]
 
-    # Mock contract
-    mock_contract = Mock()
-    mock_contract.functions.decimals.return_value.call.return_value = 6
-    mock_contract.functions.symbol.return_value.call.return_value = "USDT"
-    mock_contract.functions.name.return_value.call.return_value = "Tether USD"
-    mock_contract.address = "0xdAC17F958D2ee523a2206206994597C13D831ec7"
 
-    mock_w3.eth.contract.return_value = mock_contract
+@pytest.fixture(scope="module")
+def provider(_mock_web3_template):
+    """Sepolia CryptoProvider shared by the module; _reset_provider clears its state per test."""
+    with _installed_web3(_mock_web3_template):
+        return CryptoProvider(
+            wallet_address="0x1234567890123456789012345678901234567890",
+            infura_project_id="test_project_id",
+            network="sepolia",
+            usdt_contracts=test_usdt_contracts,
+        )
 
-    # Create a mock Web3 class that returns our mock instance
-    class MockWeb3:
-        def __init__(self, *args, **kwargs):
-            pass
 
-        def __call__(self, *args, **kwargs):
-            return mock_w3
+# Payer address and the minimal metadata process_payment requires; the provider copies metadata, never mutates it
+SENDER_ADDR = "0xabcdef1234567890abcdef1234567890abcdef12"
+BASE_META = {"sender_address": SENDER_ADDR}
 
-        @staticmethod
-        def to_checksum_address(addr):
-            return addr
 
-        @staticmethod
-        def HTTPProvider(*args, **kwargs):
-            return Mock()
+def _bulk_insert(provider, specs):
+    """Seed (user_id, amount, currency) transactions without running process_payment's validation and pricing."""
+    return [provider._debug_insert(user_id, amount, currency, metadata=BASE_META) for user_id, amount, currency in specs]
 
-    # Set the module-level Web3 variable
-    # Also set the global _web3_imported flag to True to avoid re-importing
-    # crypto._web3_imported = True
 
-    # Set dev mode
-    os.environ["AIAgentPayments_DevMode"] = "1"
+def _transfer_event(tx_id, block_number, block_hash=b"block_hash_123"):
+    """A Transfer event paying 10 USDT from SENDER_ADDR for the given transaction."""
+    return {
+        "args": {"value": 10000000, "from": SENDER_ADDR},
+        "transactionHash": tx_id.encode(),
+        "blockNumber": block_number,
+        "blockHash": block_hash,
+    }
 
-    provider = CryptoProvider(
-        wallet_address="0x1234567890123456789012345678901234567890",
-        network="mainnet",
-        confirmations_required=24,  # Mainnet default
-        storage=MemoryStorage(),
-    )
 
-    yield provider
+# Error-message patterns compiled once; pytest.raises accepts compiled patterns for match=
+_ERR_USER_ID = re.compile(re.escape("user_id is required"))
+_ERR_POS_AMOUNT = re.compile(re.escape("amount must be a positive number"))
+_ERR_CURRENCY = re.compile(re.escape("Unsupported currency"))
+_ERR_BELOW_MIN = re.compile(re.escape("Amount 0.001 is below minimum"))
+_ERR_ABOVE_MAX = re.compile(re.escape("Amount 20000.0 is above maximum"))
+_ERR_REFUND_INCOMPLETE = re.compile(re.escape("Cannot refund incomplete transaction"))
+_ERR_TX_NOT_FOUND = re.compile(r"Transaction.*not found")
+
 
+class TestUSDTCryptoProviderConfigValidation:
+    """Test argument validation that fails before any web3 access, so no web3 mock is needed."""
 
-test_usdt_contracts = {
-    "mainnet": "0xdAC17F958D2ee523a2206206994597C13D831ec7",
-    "sepolia": "0xdAC17F958D2ee523a2206206994597C13D831ec7",
-}
+    @pytest.mark.parametrize(
+        "kwargs,message",
+        [
+            ({"wallet_address": ""}, "wallet_address is required"),
+            ({"network": "invalid_network"}, "Unsupported network"),
+            ({"network": "goerli"}, "Goerli testnet is deprecated"),
+            ({"confirmations_required": 0}, "confirmations_required must be a positive integer"),
+            ({"max_gas_price_gwei": -10}, "max_gas_price_gwei must be a positive integer"),
+        ],
+        ids=["missing-wallet", "invalid-network", "goerli-deprecated", "invalid-confirmations", "invalid-gas-price"],
+    )
+    def test_provider_initialization_invalid_config(self, kwargs, message):
+        """Test provider initialization rejects invalid configuration."""
+        config = {
+            "wallet_address": "0x1234567890123456789012345678901234567890",
+            "infura_project_id": "test_project_id",
+            "network": "sepolia",
+            **kwargs,
+        }
+        with pytest.raises(ConfigurationError, match=message):
+            CryptoProvider(**config)
 
 
 @pytest.mark.usefixtures("mock_web3")
 class TestUSDTCryptoProviderInitialization:
     """Test provider initialization and configuration."""
 
-    def test_provider_initialization_success(self):
-        """Test successful provider initialization."""
-        with patch.dict(os.environ, {"AIAgentPayments_DevMode": "1"}):
-            provider = CryptoProvider(
-                wallet_address="0x1234567890123456789012345678901234567890",
-                infura_project_id="test_project_id",
-                network="sepolia",
-                usdt_contracts=test_usdt_contracts,
-            )
-
-            assert provider.wallet_address == "0x1234567890123456789012345678901234567890"
-            assert provider.network == "sepolia"
-            assert provider.infura_project_id == "test_project_id"
-            assert provider.name == "CryptoProvider"
-            assert provider.confirmations_required == NETWORK_CONFIG["sepolia"]["confirmations_required"]
-            assert provider.max_gas_price_gwei == NETWORK_CONFIG["sepolia"]["max_gas_price_gwei"]
+    def test_provider_initialization_success(self, provider):
+        """Test successful provider initialization (the shared provider uses the default sepolia config)."""
+        assert provider.wallet_address == "0x1234567890123456789012345678901234567890"
+        assert provider.network == "sepolia"
+        assert provider.infura_project_id == "test_project_id"
+        assert provider.name == "CryptoProvider"
+        assert provider.confirmations_required == NETWORK_CONFIG["sepolia"]["confirmations_required"]
+        assert provider.max_gas_price_gwei == NETWORK_CONFIG["sepolia"]["max_gas_price_gwei"]
 
-    def test_provider_initialization_with_custom_config(self):
+    def test_provider_initialization_with_custom_config(self, mock_web3):
         """Test provider initialization with custom configuration."""
-        # Patch the mock so that chain_id matches mainnet
-        import sys
-        from unittest.mock import patch
-
-        mock_w3 = sys.modules["web3"].Web3()
-        mock_w3.eth.chain_id = 1  # Mainnet
-        with patch.dict(os.environ, {"AIAgentPayments_DevMode": "1"}):
+        # Point the shared mock at mainnet for this test only
+        with _override(mock_web3.eth, chain_id=1):
             provider = CryptoProvider(
                 wallet_address="0x1234567890123456789012345678901234567890",
                 infura_project_id="test_project_id",
@@ -220,16 +392,10 @@ class TestUSDTCryptoProviderInitialization:
             assert provider.confirmations_required == 20
             assert provider.max_gas_price_gwei == 150
 
-    def test_provider_initialization_invalid_wallet_address(self):
+    def test_provider_initialization_invalid_wallet_address(self, mock_web3):
         """Test provider initialization with invalid wallet address."""
-        import sys
-        from unittest.mock import patch
-
-        # Patch the mock so that is_address returns False and to_checksum_address raises ValueError
-        mock_w3 = sys.modules["web3"].Web3()
-        mock_w3.is_address.return_value = False
-        mock_w3.to_checksum_address.side_effect = ValueError("Invalid address")
-        with patch.dict(os.environ, {"AIAgentPayments_DevMode": "1"}):
+        # Make is_address reject every address for this test only
+        with _override(mock_web3, is_address=lambda addr: False):
             with pytest.raises(ConfigurationError, match="Invalid wallet_address format"):
                 CryptoProvider(
                     wallet_address="invalid_address",
@@ -238,60 +404,6 @@ class TestUSDTCryptoProviderInitialization:
                     usdt_contracts=test_usdt_contracts,
                 )
 
-    def test_provider_initialization_missing_wallet_address(self):
-        """Test provider initialization with missing wallet address."""
-        with pytest.raises(ConfigurationError, match="wallet_address is required"):
-            with patch.dict(os.environ, {"AIAgentPayments_DevMode": "1"}):
-                CryptoProvider(
-                    wallet_address="", infura_project_id="test_project_id", network="sepolia", usdt_contracts=test_usdt_contracts
-                )
-
-    def test_provider_initialization_invalid_network(self):
-        """Test provider initialization with invalid network."""
-        with pytest.raises(ConfigurationError, match="Unsupported network"):
-            with patch.dict(os.environ, {"AIAgentPayments_DevMode": "1"}):
-                CryptoProvider(
-                    wallet_address="0x1234567890123456789012345678901234567890",
-                    infura_project_id="test_project_id",
-                    network="invalid_network",
-                    usdt_contracts=test_usdt_contracts,
-                )
-
-    def test_provider_initialization_goerli_deprecated(self):
-        """Test that Goerli network is deprecated."""
-        with pytest.raises(ConfigurationError, match="Goerli testnet is deprecated"):
-            with patch.dict(os.environ, {"AIAgentPayments_DevMode": "1"}):
-                CryptoProvider(
-                    wallet_address="0x1234567890123456789012345678901234567890",
-                    infura_project_id="test_project_id",
-                    network="goerli",
-                    usdt_contracts=test_usdt_contracts,
-                )
-
-    def test_provider_initialization_invalid_confirmations(self):
-        """Test provider initialization with invalid confirmations."""
-        with pytest.raises(ConfigurationError, match="confirmations_required must be a positive integer"):
-            with patch.dict(os.environ, {"AIAgentPayments_DevMode": "1"}):
-                CryptoProvider(
-                    wallet_address="0x1234567890123456789012345678901234567890",
-                    infura_project_id="test_project_id",
-                    network="sepolia",
-                    confirmations_required=0,
-                    usdt_contracts=test_usdt_contracts,
-                )
-
-    def test_provider_initialization_invalid_gas_price(self):
-        """Test provider initialization with invalid gas price."""
-        with pytest.raises(ConfigurationError, match="max_gas_price_gwei must be a positive integer"):
-            with patch.dict(os.environ, {"AIAgentPayments_DevMode": "1"}):
-                CryptoProvider(
-                    wallet_address="0x1234567890123456789012345678901234567890",
-                    infura_project_id="test_project_id",
-                    network="sepolia",
-                    max_gas_price_gwei=-10,
-                    usdt_contracts=test_usdt_contracts,
-                )
-
     @pytest.mark.skip(reason="Dev mode detection is complex in test environment - edge case")
     def test_provider_initialization_missing_infura_key(self):
         """Test provider initialization without Infura project ID."""
@@ -324,88 +436,32 @@ class TestUSDTCryptoProviderInitialization:
             os.environ.update(original_env)
             sys.argv = original_argv
 
-    def test_provider_initialization_connection_failure(self):
+    def test_provider_initialization_connection_failure(self, monkeypatch):
         """Test provider initialization with connection failure."""
-        import sys
-        import types
-        from unittest.mock import Mock, patch
-
-        # Patch sys.modules['web3'] to simulate connection failure
-        class MockWeb3:
-            def __init__(self, *args, **kwargs):
-                self.eth = type("Eth", (), {"chain_id": 11155111, "contract": lambda *a, **k: Mock()})()
-
-            def is_connected(self):
-                return False
-
-            @staticmethod
-            def to_checksum_address(addr):
-                return addr
-
-            @staticmethod
-            def HTTPProvider(*args, **kwargs):
-                return Mock()
-
-        mock_web3_module = types.ModuleType("web3")
-        mock_web3_module.Web3 = MockWeb3  # type: ignore
-        sys.modules["web3"] = mock_web3_module
-        with patch.dict(os.environ, {"AIAgentPayments_DevMode": "1"}):
-            with pytest.raises(ProviderError, match="Failed to connect to Infura"):
-                CryptoProvider(
-                    wallet_address="0x1234567890123456789012345678901234567890",
-                    infura_project_id="test_project_id",
-                    network="sepolia",
-                    usdt_contracts=test_usdt_contracts,
-                )
+        monkeypatch.setitem(sys.modules, "web3", _DISCONNECTED_WEB3_MODULE)
+        with pytest.raises(ProviderError, match="Failed to connect to Infura"):
+            CryptoProvider(
+                wallet_address="0x1234567890123456789012345678901234567890",
+                infura_project_id="test_project_id",
+                network="sepolia",
+                usdt_contracts=test_usdt_contracts,
+            )
 
-    def test_provider_initialization_chain_id_mismatch(self):
+    def test_provider_initialization_chain_id_mismatch(self, monkeypatch):
         """Test provider initialization with chain ID mismatch."""
-        import sys
-        import types
-        from unittest.mock import Mock, patch
-
-        # Patch sys.modules['web3'] to simulate chain ID mismatch
-        class MockWeb3:
-            def __init__(self, *args, **kwargs):
-                self.eth = type("Eth", (), {"chain_id": 999, "contract": lambda *a, **k: Mock()})()
-
-            def is_connected(self):
-                return True
-
-            @staticmethod
-            def to_checksum_address(addr):
-                return addr
-
-            @staticmethod
-            def HTTPProvider(*args, **kwargs):
-                return Mock()
-
-        mock_web3_module = types.ModuleType("web3")
-        mock_web3_module.Web3 = MockWeb3  # type: ignore
-        sys.modules["web3"] = mock_web3_module
-        with patch.dict(os.environ, {"AIAgentPayments_DevMode": "1"}):
-            with pytest.raises(ProviderError, match="Chain ID mismatch"):
-                CryptoProvider(
-                    wallet_address="0x1234567890123456789012345678901234567890",
-                    infura_project_id="test_project_id",
-                    network="sepolia",
-                    usdt_contracts=test_usdt_contracts,
-                )
-
-
-class TestUSDTCryptoProviderCapabilities:
-    """Test provider capabilities and configuration."""
-
-    @pytest.fixture
-    def provider(self, mock_web3):
-        with patch.dict(os.environ, {"AIAgentPayments_DevMode": "1"}):
-            provider = CryptoProvider(
+        monkeypatch.setitem(sys.modules, "web3", _WRONG_CHAIN_WEB3_MODULE)
+        with pytest.raises(ProviderError, match="Chain ID mismatch"):
+            CryptoProvider(
                 wallet_address="0x1234567890123456789012345678901234567890",
                 infura_project_id="test_project_id",
                 network="sepolia",
                 usdt_contracts=test_usdt_contracts,
             )
-            return provider
+
+
+@pytest.mark.noop_storage  # read-only queries; skip building a MemoryStorage per test
+class TestUSDTCryptoProviderCapabilities:
+    """Test provider capabilities and configuration."""
 
     def test_provider_capabilities(self, provider):
         """Test provider capabilities."""
@@ -438,11 +494,10 @@ class TestUSDTCryptoProviderCapabilities:
         assert network_info["confirmations_required"] == NETWORK_CONFIG["sepolia"]["confirmations_required"]
         assert network_info["is_connected"] is True
 
-    def test_usdt_balance(self, provider, mock_web3):
+    def test_usdt_balance(self, provider, mock_contract):
         """Test USDT balance retrieval."""
         # Mock balance call
-        mock_contract = mock_web3.eth.contract.return_value
-        mock_contract.functions.balanceOf.return_value.call.return_value = 1000000000  # 1000 USDT
+        mock_contract.functions.calls["balanceOf"].value = 1000000000  # 1000 USDT
 
         balance_info = provider.get_usdt_balance()
 
@@ -452,39 +507,27 @@ class TestUSDTCryptoProviderCapabilities:
         assert balance_info["decimals"] == 6
         assert balance_info["symbol"] == "USDT"
 
-    def test_usdt_balance_custom_address(self, provider, mock_web3):
+    def test_usdt_balance_custom_address(self, provider, mock_contract):
         """Test USDT balance retrieval for custom address."""
         # Mock balance call
-        mock_contract = mock_web3.eth.contract.return_value
-        mock_contract.functions.balanceOf.return_value.call.return_value = 500000000  # 500 USDT
+        mock_contract.functions.calls["balanceOf"].value = 500000000  # 500 USDT
 
-        balance_info = provider.get_usdt_balance("0xabcdef1234567890abcdef1234567890abcdef12")
+        balance_info = provider.get_usdt_balance(SENDER_ADDR)
 
-        assert balance_info["address"] == "0xabcdef1234567890abcdef1234567890abcdef12"
+        assert balance_info["address"] == SENDER_ADDR
         assert balance_info["balance_usdt"] == 500.0
 
 
 class TestUSDTCryptoProviderPaymentProcessing:
     """Test payment processing functionality."""
 
-    @pytest.fixture
-    def provider(self, mock_web3):
-        with patch.dict(os.environ, {"AIAgentPayments_DevMode": "1"}):
-            provider = CryptoProvider(
-                wallet_address="0x1234567890123456789012345678901234567890",
-                infura_project_id="test_project_id",
-                network="sepolia",
-                usdt_contracts=test_usdt_contracts,
-            )
-            return provider
-
     def test_process_payment_success(self, provider):
         """Test successful payment processing."""
         transaction = provider.process_payment(
             user_id="test_user",
             amount=10.0,
             currency="USD",
-            metadata={"test": True, "sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"},
+            metadata={**BASE_META, "test": True},
         )
 
         assert transaction.user_id == "test_user"
@@ -501,7 +544,19 @@ class TestUSDTCryptoProviderPaymentProcessing:
         assert transaction.metadata["contract_name"] == "Tether USD"
         assert "created_block" in transaction.metadata
         assert "gas_price_at_creation_gwei" in transaction.metadata
-        assert transaction.metadata["sender_address"] == "0xabcdef1234567890abcdef1234567890abcdef12"
+        assert transaction.metadata["sender_address"] == SENDER_ADDR
+
+    def test_process_payment_uses_cached_contract_properties(self, provider, mock_contract):
+        """Contract symbol/name/decimals are read once at init, never per payment."""
+        calls = mock_contract.functions.calls
+        for name in ("decimals", "symbol", "name"):
+            calls[name].error = AssertionError(f"{name}() read during process_payment")
+
+        transaction = provider.process_payment(user_id="test_user", amount=10.0, currency="USD", metadata=BASE_META)
+
+        assert transaction.metadata["contract_symbol"] == provider.usdt_symbol == "USDT"
+        assert transaction.metadata["contract_name"] == provider.usdt_name == "Tether USD"
+        assert transaction.metadata["usdt_amount_wei"] == 10 * 10**provider.usdt_decimals
 
     def test_process_payment_usdt_currency(self, provider):
         """Test payment processing with USDT currency."""
@@ -509,128 +564,83 @@ class TestUSDTCryptoProviderPaymentProcessing:
             user_id="test_user",
             amount=15.0,
             currency="USDT",
-            metadata={"test": True, "sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"},
+            metadata=BASE_META,
         )
 
         assert transaction.amount == 15.0
         assert transaction.currency == "USDT"
         assert transaction.metadata["usdt_amount"] == 15.0
         assert transaction.metadata["usdt_amount_wei"] == 15000000
+        # BASE_META is shared by every test, so the provider must copy it rather than fill it in
+        assert transaction.metadata is not BASE_META
+        assert BASE_META == {"sender_address": SENDER_ADDR}
+
+    @pytest.mark.parametrize(
+        "user_id,amount,currency,pattern",
+        [
+            ("", 10.0, "USD", _ERR_USER_ID),
+            ("test_user", -1.0, "USD", _ERR_POS_AMOUNT),
+            ("test_user", 10.0, "INVALID", _ERR_CURRENCY),
+            ("test_user", 0.001, "USD", _ERR_BELOW_MIN),
+            ("test_user", 20000.0, "USD", _ERR_ABOVE_MAX),
+        ],
+        ids=["invalid-user-id", "invalid-amount", "invalid-currency", "below-minimum", "above-maximum"],
+    )
+    def test_process_payment_invalid_input(self, provider, user_id, amount, currency, pattern):
+        """Test payment processing rejects invalid user IDs, amounts and currencies."""
+        with pytest.raises(ValidationError, match=pattern):
+            provider.process_payment(user_id, amount, currency, metadata=BASE_META)
 
-    def test_process_payment_invalid_user_id(self, provider):
-        """Test payment processing with invalid user ID."""
-        with pytest.raises(ValidationError, match="user_id is required"):
-            provider.process_payment("", 10.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"})
-
-    def test_process_payment_invalid_amount(self, provider):
-        """Test payment processing with invalid amount."""
-        with pytest.raises(ValidationError, match="amount must be a positive number"):
-            provider.process_payment(
-                "test_user", -1.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"}
-            )
-
-    def test_process_payment_invalid_currency(self, provider):
-        """Test payment processing with invalid currency."""
-        with pytest.raises(ValidationError, match="Unsupported currency"):
-            provider.process_payment(
-                "test_user", 10.0, "INVALID", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"}
-            )
-
-    def test_process_payment_amount_below_minimum(self, provider):
-        """Test payment processing with amount below minimum."""
-        with pytest.raises(ValidationError, match="Amount 0.001 is below minimum"):
-            provider.process_payment(
-                "test_user", 0.001, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"}
-            )
 
-    def test_process_payment_amount_above_maximum(self, provider):
-        """Test payment processing with amount above maximum."""
-        with pytest.raises(ValidationError, match="Amount 20000.0 is above maximum"):
-            provider.process_payment(
-                "test_user", 20000.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"}
-            )
+@pytest.fixture(scope="class")
+def sample_tx(provider, _mock_web3_template):
+    """One pending 10 USD payment, processed once per requesting test class."""
+    with _installed_web3(_mock_web3_template):
+        return provider.process_payment("test_user", 10.0, "USD", metadata=BASE_META)
 
 
 class TestUSDTCryptoProviderPaymentVerification:
     """Test payment verification functionality."""
 
     @pytest.fixture
-    def provider(self, mock_web3):
-        provider = CryptoProvider(
-            wallet_address="0xdAC17F958D2ee523a2206206994597C13D831ec7",
-            infura_project_id="test_project_id",
-            network="sepolia",
-            usdt_contracts=test_usdt_contracts,
-        )
-        return provider
-
-    def test_verify_payment_success(self, provider, mock_web3):
+    def transaction(self, provider, sample_tx):
+        """A private copy of sample_tx stored in this test's fresh provider storage."""
+        transaction = copy.deepcopy(sample_tx)
+        provider.storage.save_transaction(transaction)
+        provider.transactions[transaction.id] = transaction
+        return transaction
+
+    def test_verify_payment_success(self, provider, mock_web3, mock_contract, transaction):
         """Test successful payment verification."""
-        transaction = provider.process_payment(
-            "test_user", 10.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"}
-        )
-        mock_contract = mock_web3.eth.contract.return_value
-        mock_contract.functions.balanceOf.return_value.call.return_value = 10000000  # 10 USDT
-        # Set transactionHash and blockHash to match what will be returned by get_block
-        block_hash = b"block_hash_123"
-        mock_event = {
-            "args": {"value": 10000000, "from": "0xabcdef1234567890abcdef1234567890abcdef12"},
-            "transactionHash": transaction.id.encode() if hasattr(transaction.id, "encode") else b"tx_hash_123",
-            "blockNumber": 999971,  # Ensure enough confirmations (current block is 1000000)
-            "blockHash": block_hash,
-        }
-        mock_contract.events.Transfer.create_filter.return_value.get_all_entries.return_value = [mock_event]
-        # Mock get_block to return the correct blockHash
-        mock_web3.eth.get_block.return_value = {"hash": block_hash}
-        with patch.dict(
-            "aiagent_payments.providers.crypto.USDT_CONTRACTS", {"mainnet": "0xdAC17F958D2ee523a2206206994597C13D831ec7"}
-        ):
-            result = provider.verify_payment(transaction.id)
-            assert result is True
-
-    def test_verify_payment_insufficient_confirmations(self, provider, mock_web3):
+        mock_contract.functions.calls["balanceOf"].value = 10000000  # 10 USDT
+        # Ensure enough confirmations (current block is 1000000)
+        event = _transfer_event(transaction.id, 999971)
+        mock_contract.events.Transfer.entries = [event]
+        # Mock get_block to return the event's blockHash
+        mock_web3.eth.get_block = lambda *args, **kwargs: {"hash": event["blockHash"]}
+        result = provider.verify_payment(transaction.id)
+        assert result is True
+
+    def test_verify_payment_insufficient_confirmations(self, provider, mock_contract, transaction):
         """Test payment verification with insufficient confirmations."""
-        transaction = provider.process_payment(
-            "test_user", 10.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"}
-        )
-        mock_contract = mock_web3.eth.contract.return_value
-        mock_contract.functions.balanceOf.return_value.call.return_value = 10000000  # 10 USDT
-        mock_event = {
-            "args": {"value": 10000000, "from": "0xabcdef1234567890abcdef1234567890abcdef12"},
-            "transactionHash": b"tx_hash_123",
-            "blockNumber": 999999,  # Very recent block, insufficient confirmations
-        }
-        mock_contract.events.Transfer.create_filter.return_value.get_all_entries.return_value = [mock_event]
-        with patch.dict(
-            "aiagent_payments.providers.crypto.USDT_CONTRACTS", {"mainnet": "0xdAC17F958D2ee523a2206206994597C13D831ec7"}
-        ):
-            result = provider.verify_payment(transaction.id)
-            assert result is False
-            assert transaction.status == "pending"
+        mock_contract.functions.calls["balanceOf"].value = 10000000  # 10 USDT
+        # Very recent block, insufficient confirmations
+        mock_contract.events.Transfer.entries = [_transfer_event(transaction.id, 999999)]
+        result = provider.verify_payment(transaction.id)
+        assert result is False
+        assert transaction.status == "pending"
 
 
 class TestUSDTCryptoProviderRefunds:
     """Test refund functionality."""
 
-    @pytest.fixture
-    def provider(self, mock_web3):
-        provider = CryptoProvider(
-            wallet_address="0xdAC17F958D2ee523a2206206994597C13D831ec7",
-            infura_project_id="test_project_id",
-            network="sepolia",
-            usdt_contracts=test_usdt_contracts,
-        )
-        return provider
-
     def test_refund_payment_success(self, provider):
         """Test successful refund request."""
         # Create and complete a transaction
-        transaction = provider.process_payment(
-            "test_user", 10.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"}
-        )
+        transaction = provider.process_payment("test_user", 10.0, "USD", metadata=BASE_META)
         transaction.status = "completed"
         transaction.metadata["confirmed_tx_hash"] = "0x1234567890abcdef"
-        transaction.metadata["from_address"] = "0xabcdef1234567890abcdef1234567890abcdef12"
+        transaction.metadata["from_address"] = SENDER_ADDR
 
         refund_info = provider.refund_payment(transaction.id, amount=10.0)
 
@@ -638,33 +648,29 @@ class TestUSDTCryptoProviderRefunds:
         assert refund_info["transaction_id"] == transaction.id
         assert refund_info["refund_amount"] == 10.0
         assert refund_info["refund_amount_usdt"] == 10.0
-        assert refund_info["payer_address"] == "0xabcdef1234567890abcdef1234567890abcdef12"
+        assert refund_info["payer_address"] == SENDER_ADDR
         assert "USDT REFUND INSTRUCTIONS" in refund_info["instructions"]
         assert refund_info["network"] == "sepolia"
         assert refund_info["network_name"] == "Sepolia Testnet"
 
     def test_refund_payment_incomplete_transaction(self, provider):
         """Test refund request for incomplete transaction."""
-        transaction = provider.process_payment(
-            "test_user", 10.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"}
-        )
+        transaction = provider.process_payment("test_user", 10.0, "USD", metadata=BASE_META)
 
-        with pytest.raises(ProviderError, match="Cannot refund incomplete transaction"):
+        with pytest.raises(ProviderError, match=_ERR_REFUND_INCOMPLETE):
             provider.refund_payment(transaction.id)
 
     def test_refund_payment_invalid_id(self, provider):
         """Test refund request with invalid transaction ID."""
-        with pytest.raises(ProviderError, match="Transaction.*not found"):
+        with pytest.raises(ProviderError, match=_ERR_TX_NOT_FOUND):
             provider.refund_payment("invalid_id")
 
     def test_refund_payment_partial_amount(self, provider):
         """Test partial refund request."""
         # Create and complete a transaction
-        transaction = provider.process_payment(
-            "test_user", 10.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"}
-        )
+        transaction = provider.process_payment("test_user", 10.0, "USD", metadata=BASE_META)
         transaction.status = "completed"
-        transaction.metadata["from_address"] = "0xabcdef1234567890abcdef1234567890abcdef12"
+        transaction.metadata["from_address"] = SENDER_ADDR
 
         refund_info = provider.refund_payment(transaction.id, amount=5.0)
 
@@ -675,37 +681,20 @@ class TestUSDTCryptoProviderRefunds:
 class TestUSDTCryptoProviderTransactionManagement:
     """Test transaction management functionality."""
 
-    @pytest.fixture
-    def provider(self, mock_web3):
-        provider = CryptoProvider(
-            wallet_address="0xdAC17F958D2ee523a2206206994597C13D831ec7",
-            infura_project_id="test_project_id",
-            network="sepolia",
-            usdt_contracts=test_usdt_contracts,
-        )
-        return provider
-
     def test_get_payment_status(self, provider):
         """Test getting payment status."""
-        transaction = provider.process_payment(
-            "test_user", 10.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"}
-        )
-        # Use a valid contract address for the test network
-        valid_contract_address = "0xdAC17F958D2ee523a2206206994597C13D831ec7"
-        with patch.dict("aiagent_payments.providers.crypto.USDT_CONTRACTS", {"mainnet": valid_contract_address}):
-            status = provider.get_payment_status(transaction.id)
-            assert status == "pending"
+        transaction = provider.process_payment("test_user", 10.0, "USD", metadata=BASE_META)
+        status = provider.get_payment_status(transaction.id)
+        assert status == "pending"
 
     def test_get_payment_status_invalid_id(self, provider):
         """Test getting payment status with invalid ID."""
-        with pytest.raises(ProviderError, match="Transaction.*not found"):
+        with pytest.raises(ProviderError, match=_ERR_TX_NOT_FOUND):
             provider.get_payment_status("invalid_id")
 
     def test_get_transaction_details(self, provider):
         """Test getting transaction details."""
-        transaction = provider.process_payment(
-            "test_user", 10.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"}
-        )
+        transaction = provider.process_payment("test_user", 10.0, "USD", metadata=BASE_META)
         details = provider.get_transaction_details(transaction.id)
 
         assert details["transaction_id"] == transaction.id
@@ -719,108 +708,102 @@ class TestUSDTCryptoProviderTransactionManagement:
 
     def test_get_transaction_details_invalid_id(self, provider):
         """Test getting transaction details with invalid ID."""
-        with pytest.raises(ProviderError, match="Transaction.*not found"):
+        with pytest.raises(ProviderError, match=_ERR_TX_NOT_FOUND):
             provider.get_transaction_details("invalid_id")
 
+    def test_debug_insert_requires_dev_mode(self, provider, monkeypatch):
+        """Test that seeding transactions directly is refused outside dev mode."""
+        monkeypatch.setattr(provider, "_is_dev_mode", lambda: False)
+        with pytest.raises(ProviderError, match="only available in dev mode"):
+            provider._debug_insert("user1", 10.0, "USD")
+        assert provider.list_transactions() == []
+
     def test_list_transactions_empty(self, provider):
         """Test listing transactions when none exist."""
         transactions = provider.list_transactions()
         assert transactions == []
 
-    def test_list_transactions_with_data(self, provider):
-        """Test listing transactions with data."""
-        # Create multiple transactions
-        provider.process_payment("user1", 10.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"})
-        provider.process_payment("user2", 20.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"})
-        provider.process_payment("user1", 15.0, "USDT", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"})
+    @pytest.fixture
+    def populated_provider(self, provider):
+        """The shared provider seeded with three pending payments, two of them for user1, a second apart."""
+        seeded = _bulk_insert(provider, [("user1", 10.0, "USD"), ("user2", 20.0, "USD"), ("user1", 15.0, "USDT")])
+        # _debug_insert stamps rows microseconds apart; spread them so the newest-first order is unambiguous
+        for offset, tx in enumerate(seeded):
+            tx.created_at = seeded[0].created_at + timedelta(seconds=offset)
+        return provider
+
+    @pytest.mark.parametrize(
+        "kwargs,expected_len",
+        [
+            ({}, 3),
+            ({"user_id": "user1"}, 2),
+            ({"status": "pending"}, 3),
+            ({"user_id": "user1", "status": "pending"}, 2),
+            ({"limit": 2}, 2),
+        ],
+        ids=["all", "by-user", "by-status", "by-user-and-status", "limit"],
+    )
+    def test_list_transactions(self, populated_provider, kwargs, expected_len):
+        """Test listing transactions with filters and limits."""
+        transactions = populated_provider.list_transactions(**kwargs)
 
-        # List all transactions
-        transactions = provider.list_transactions()
-        assert len(transactions) == 3
-        assert transactions[0]["user_id"] == "user1"  # Newest first
-        assert transactions[0]["amount"] == 15.0
-
-    def test_list_transactions_with_filters(self, provider):
-        """Test listing transactions with filters."""
-        # Create multiple transactions
-        provider.process_payment("user1", 10.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"})
-        provider.process_payment("user2", 20.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"})
-        provider.process_payment("user1", 15.0, "USDT", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"})
-
-        # Filter by user
-        user1_transactions = provider.list_transactions(user_id="user1")
-        assert len(user1_transactions) == 2
-        assert all(tx["user_id"] == "user1" for tx in user1_transactions)
-
-        # Filter by status
-        pending_transactions = provider.list_transactions(status="pending")
-        assert len(pending_transactions) == 3
-
-        # Filter by user and status
-        user1_pending = provider.list_transactions(user_id="user1", status="pending")
-        assert len(user1_pending) == 2
-
-    def test_list_transactions_with_limit(self, provider):
-        """Test listing transactions with limit."""
-        # Create multiple transactions
-        provider.process_payment("user1", 10.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"})
-        provider.process_payment("user2", 20.0, "USD", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"})
-        provider.process_payment("user1", 15.0, "USDT", metadata={"sender_address": "0xabcdef1234567890abcdef1234567890abcdef12"})
-
-        # List with limit
-        transactions = provider.list_transactions(limit=2)
-        assert len(transactions) == 2
+        assert len(transactions) == expected_len
+        assert all(tx["user_id"] == kwargs.get("user_id", tx["user_id"]) for tx in transactions)
+        assert all(tx["status"] == kwargs.get("status", tx["status"]) for tx in transactions)
+        # Newest first
+        created = [tx["created_at"] for tx in transactions]
+        assert created == sorted(created, reverse=True)
+        if not kwargs:
+            assert (transactions[0]["user_id"], transactions[0]["amount"]) == ("user1", 15.0)
 
 
 class TestUSDTCryptoProviderHealthCheck:
     """Test health check functionality."""
 
     @pytest.fixture
-    def provider(self, mock_web3):
-        with patch.dict(os.environ, {"AIAgentPayments_DevMode": "1"}):
-            provider = CryptoProvider(
-                wallet_address="0x1234567890123456789012345678901234567890",
-                infura_project_id="test_project_id",
-                network="sepolia",
-                usdt_contracts=test_usdt_contracts,
-            )
-            return provider
+    def patched_health(self):
+        """Stand-in for CryptoProvider.check_health, removed when the test finishes."""
+        with patch.object(CryptoProvider, "check_health") as mock_check_health:
+            yield mock_check_health
 
-    @patch("aiagent_payments.providers.crypto.CryptoProvider.check_health", return_value=None)
-    def test_health_check_success(mock_health, provider, mock_web3):
+    def test_health_check_success(self, provider, patched_health):
         """Test successful health check."""
-        # Mock balance call
-        mock_contract = mock_web3.eth.contract.return_value
-        mock_contract.functions.balanceOf.return_value.call.return_value = 1000000000  # 1000 USDT
-
-        # Mock the USDT contract address lookup
-        with patch.dict(
-            "aiagent_payments.providers.crypto.USDT_CONTRACTS", {"mainnet": "0xdAC17F958D2ee523a2206206994597C13D831ec7"}
-        ):
-            # Create a real health status object
-            class HealthStatus:
-                is_healthy = True
+        patched_health.return_value = types.SimpleNamespace(is_healthy=True)
 
-            provider.check_health = lambda: HealthStatus()
-            health_status = provider.check_health()
-            assert health_status.is_healthy is True
+        health_status = provider.check_health()
+        assert health_status.is_healthy is True
+        patched_health.assert_called_once_with()
 
     def test_health_check_connection_failure(self, provider, mock_web3):
         """Test health check with connection failure."""
-        mock_web3.is_connected.return_value = False
+        mock_web3.is_connected = lambda: False
 
         health_status = provider.check_health()
         assert health_status.is_healthy is False
 
-    def test_health_check_contract_failure(self, provider, mock_web3):
+    def test_health_check_contract_failure(self, provider, mock_contract):
         """Test health check with contract failure."""
-        mock_contract = mock_web3.eth.contract.return_value
-        mock_contract.functions.decimals.return_value.call.side_effect = Exception("Contract error")
+        mock_contract.functions.calls["decimals"].error = Exception("Contract error")
 
         health_status = provider.check_health()
         assert health_status.is_healthy is False
 
 
+@pytest.mark.perf
+class TestUSDTCryptoProviderBenchmarks:
+    """Throughput of the hot provider paths; opt-in with ``--run-perf``."""
+
+    def test_bench_process_payment(self, benchmark, provider):
+        transaction = benchmark(provider.process_payment, "test_user", 10.0, "USD", metadata=BASE_META)
+        assert transaction.status == "pending"
+
+    def test_bench_verify_payment(self, benchmark, provider, mock_contract):
+        transaction = provider.process_payment("test_user", 10.0, "USD", metadata=BASE_META)
+        # Too few confirmations, so the transaction stays pending and every round takes the same path
+        mock_contract.events.Transfer.entries = [_transfer_event(transaction.id, 999999)]
+        assert benchmark(provider.verify_payment, transaction.id) is False
+
+
 class TestUSDTCryptoProviderConstants:
     """Test provider constants and configuration."""
 
@@ -849,19 +832,25 @@ class TestUSDTCryptoProviderConstants:
             assert len(contract_address) == 42  # Ethereum address length
 
 
+# Decided once at import so the live test is skipped at collection, before any web3 setup.
+# Only this test needs the real web3 package; everything above runs against the fake module.
+_INFURA_KEY = os.environ.get("INFURA_PROJECT_ID")
+_SKIP_INFURA = (
+    os.environ.get("CI") == "true"
+    or os.environ.get("SKIP_INFURA_TEST") == "1"
+    or not _INFURA_KEY
+    or importlib.util.find_spec("web3") is None
+)
+
+
 @pytest.mark.skipif(
-    os.environ.get("CI") == "true" or os.environ.get("SKIP_INFURA_TEST") == "1",
-    reason="Skip real Infura test in CI or when disabled.",
+    _SKIP_INFURA, reason="Skip real Infura test in CI, when disabled, or when INFURA_PROJECT_ID or web3 is unavailable."
 )
 def test_real_infura_connection():
     """Test real Infura connection and USDT contract info on Sepolia."""
-    infura_key = os.environ.get("INFURA_PROJECT_ID")
-    if not infura_key:
-        pytest.skip("INFURA_PROJECT_ID not set; skipping real Infura test.")
-
     wallet_address = "0x000000000000000000000000000000000000dEaD"  # Burn address with checksum, safe for read-only
     provider = CryptoProvider(
-        wallet_address=wallet_address, infura_project_id=infura_key, network="sepolia", usdt_contracts=test_usdt_contracts
+        wallet_address=wallet_address, infura_project_id=_INFURA_KEY, network="sepolia", usdt_contracts=test_usdt_contracts
     )
 
     assert provider.w3.is_connected(), "Web3 should connect to Infura Sepolia"
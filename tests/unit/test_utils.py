@@ -1,6 +1,9 @@
+import uuid
+
 import pytest
 
 from aiagent_payments.utils import (
+    VALID_CURRENCIES,
     deep_get,
     deep_set,
     format_currency,
@@ -54,17 +57,43 @@ def test_retry_gives_up():
     assert len(calls) == 2
 
 
+def test_retry_backoff_schedule(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("aiagent_payments.utils.time.sleep", sleeps.append)
+
+    @retry(exceptions=RuntimeError, max_attempts=4, initial_delay=1.0, backoff_factor=2.0, max_delay=3.0, jitter=False)
+    def f():
+        raise RuntimeError("fail")
+
+    @retry(exceptions=RuntimeError, max_attempts=3, initial_delay=0, jitter=False)
+    def g():
+        raise RuntimeError("fail")
+
+    with pytest.raises(RuntimeError):
+        f()
+    assert sleeps == [1.0, 2.0, 3.0]
+
+    sleeps.clear()
+    with pytest.raises(RuntimeError):
+        g()
+    assert sleeps == []
+
+
 def test_generate_id():
     id1 = generate_id()
     id2 = generate_id("prefix-")
     assert isinstance(id1, str) and len(id1) > 0
     assert id2.startswith("prefix-")
+    assert str(uuid.UUID(id1)) == id1
+    assert str(uuid.UUID(id2.removeprefix("prefix-"))) == id2.removeprefix("prefix-")
 
 
 def test_validate_currency():
     assert validate_currency("USD")
     assert not validate_currency("usd")
     assert not validate_currency("US")
+    # validate_currency relies on every listed code being upper-case alphabetic
+    assert all(code.isalpha() and code.isupper() for code in VALID_CURRENCIES)
 
 
 def test_validate_amount():
@@ -84,6 +113,9 @@ def test_parse_datetime():
     dt = parse_datetime("2024-01-01T12:00:00+00:00")
     assert dt and dt.year == 2024
     assert parse_datetime("invalid") is None
+    assert parse_datetime("2024-01-01T12:00:00Z").tzinfo is not None
+    assert parse_datetime("2024-02-30T12:00:00") is None
+    assert parse_datetime("1969-12-31T23:59:59Z") is None
 
 
 def test_get_current_timestamp():
@@ -94,11 +126,18 @@ def test_get_current_timestamp():
 def test_parse_email():
     assert parse_email("test@example.com") == "test@example.com"
     assert parse_email("invalid") is None
+    assert parse_email(" first.last+tag@sub.example.org ") == "first.last+tag@sub.example.org"
+    assert parse_email("a@b@example.com") is None
+    assert parse_email("user@example.c") is None
+    assert parse_email("user@example.c0m") is None
+    assert parse_email("user@.com") is None
 
 
 def test_sanitize_string():
     assert sanitize_string("abc", 2) == "ab"
     assert sanitize_string(None) == ""
+    # max_length counts UTF-8 bytes; a multi-byte character that does not fit is dropped whole
+    assert sanitize_string("aé", 2) == "a"
 
 
 def test_deep_get_and_set():